@@ -0,0 +1,202 @@
+import argparse
+import csv
+import glob
+import os
+import sys
+from typing import List, Dict, Iterator
+
+from engine import PricingEngine, write_cost_table
+from instrumentation import RunProfiler, write_stage_log
+
+# Engine of the current worker process, loaded once by init_worker
+_worker_engine = None
+
+
+def collect_parts_lists(inputs: List[str], directory_pattern: str = '*.txt') -> List[str]:
+    """Expand directories and glob patterns into a sorted list of parts list files.
+
+    Directories contribute the files matching directory_pattern.
+    """
+    filenames = []
+
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            filenames.extend(glob.glob(os.path.join(pattern, directory_pattern)))
+        else:
+            filenames.extend(glob.glob(pattern))
+
+    return sorted(set(filenames))
+
+
+def cost_table_path(filename: str, output_dir: str = None) -> str:
+    """Return the cost table CSV path for a parts list file"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    directory = output_dir if output_dir else os.path.dirname(filename)
+    return os.path.join(directory, f"{stem}_cost.csv")
+
+
+def price_and_write(engine: PricingEngine, filename: str, output_dir: str = None, cache: bool = False,
+                    parse_workers: int = 1) -> Dict:
+    """Price one parts list and write its cost table.
+
+    Errors are returned in the result instead of raised, so one bad file
+    doesn't stop the rest of the batch.
+    """
+    from bulk_parse import BULK_MIN_BYTES
+
+    try:
+        # Small files are summarized as they stream; large ones are read in bulk
+        if cache or parse_workers > 1 or os.path.getsize(filename) >= BULK_MIN_BYTES:
+            result = engine.price_file(filename, cache=cache, parse_workers=parse_workers)
+        else:
+            result = engine.price_file(filename, streaming=True)
+        output = cost_table_path(filename, output_dir)
+        write_cost_table(output, result['cost_table'])
+        return {
+            'filename': filename,
+            'output': output,
+            'parts': result['parts'],
+            'total_cost': result['total_cost'],
+            'stages': result['stages'],
+            'error': ''
+        }
+    except Exception as e:
+        return {'filename': filename, 'output': '', 'parts': 0, 'total_cost': 0.0, 'stages': [], 'error': str(e)}
+
+
+def make_engine(price_table_path: str, memo_path: str = None) -> PricingEngine:
+    """Create a pricing engine, with a formula memo warmed from memo_path if given"""
+    memo = None
+    if memo_path:
+        from formula_memo import FormulaMemo
+        memo = FormulaMemo()
+        memo.load(memo_path)
+    return PricingEngine(price_table_path, memo)
+
+
+def init_worker(price_table_path: str, memo_path: str = None):
+    """Load the price table (and formula memo) once per worker process"""
+    global _worker_engine
+    _worker_engine = make_engine(price_table_path, memo_path)
+    # Parse the price table now rather than on the first task
+    _worker_engine.price_data
+
+
+def worker_price_and_write(filename: str, output_dir: str = None, cache: bool = False) -> Dict:
+    return price_and_write(_worker_engine, filename, output_dir, cache)
+
+
+def price_files(filenames: List[str], price_table_path: str, output_dir: str = None,
+                workers: int = 1, cache: bool = False, memo_path: str = None,
+                parse_workers: int = 1) -> Iterator[Dict]:
+    """Price parts lists, yielding one result per file in input order.
+
+    With memo_path, formula results are memoized and warmed from that file.
+    Only a single-process run saves the memo back, since worker processes
+    each hold their own copy. parse_workers > 1 splits each large file
+    across that many processes instead of pricing several files at once.
+    """
+    workers = 1 if parse_workers > 1 else max(1, min(workers, len(filenames)))
+
+    if workers == 1:
+        engine = make_engine(price_table_path, memo_path)
+        for filename in filenames:
+            yield price_and_write(engine, filename, output_dir, cache, parse_workers)
+        if engine.memo is not None:
+            engine.memo.save(memo_path)
+            print(f"Formula memo: {engine.memo.hits} hits, {engine.memo.misses} misses "
+                  f"({engine.memo.hit_rate():.0%} hit rate)")
+        return
+
+    # Only multi-process runs pay for importing multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Hand out files in chunks so thousands of small files don't pay per-task overhead
+    chunksize = max(1, len(filenames) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(price_table_path, memo_path)) as executor:
+        yield from executor.map(worker_price_and_write, filenames, [output_dir] * len(filenames),
+                                [cache] * len(filenames), chunksize=chunksize)
+
+
+def write_grand_total_report(filename: str, results: List[Dict]):
+    """Write a per-file total cost report followed by the grand total"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["File", "ADIN Parts", "Total Price", "Error"])
+        for result in results:
+            writer.writerow([result['filename'], result['parts'], result['total_cost'], result['error']])
+        writer.writerow(["GRAND TOTAL", sum(r['parts'] for r in results),
+                         sum(r['total_cost'] for r in results), ""])
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Price parts lists without the UI")
+    parser.add_argument('inputs', nargs='+', help="Parts list files, directories or glob patterns")
+    parser.add_argument('--price-table', default="price_table.csv", help="Price table CSV")
+    parser.add_argument('--output-dir', help="Directory for cost tables (default: next to each input)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU core)")
+    parser.add_argument('--report', help="Write a per-file and grand total report CSV")
+    parser.add_argument('--cache', action='store_true',
+                        help="Read and write the binary parsed-table cache next to each input")
+    parser.add_argument('--memo', help="Memoize formula results, persisted in this file across runs "
+                                       "(large tables use NumPy and bypass it)")
+    parser.add_argument('--parse-workers', type=int, default=1,
+                        help="Split each large parts list into byte ranges parsed by this many processes "
+                             "(0 = one per CPU core); files are then priced one at a time")
+    parser.add_argument('--timings', help="Append each file's per-stage time, rows and peak memory "
+                                          "to this JSON lines log")
+    parser.add_argument('--profile', help="Write a cProfile profile of the run to this file (and the top "
+                                          "memory allocations next to it); prices in a single process")
+    args = parser.parse_args(argv)
+
+    filenames = collect_parts_lists(args.inputs)
+    if not filenames:
+        print("No parts list files found", file=sys.stderr)
+        return 1
+
+    if not PricingEngine(args.price_table).price_data:
+        print(f"Price table not found or empty: {args.price_table}", file=sys.stderr)
+        return 1
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+    profiler = None
+    if args.profile:
+        # cProfile only sees this process
+        workers = 1
+        profiler = RunProfiler(args.profile)
+        profiler.start()
+
+    results = []
+    parse_workers = args.parse_workers if args.parse_workers > 0 else os.cpu_count() or 1
+    for result in price_files(filenames, args.price_table, args.output_dir, workers, args.cache,
+                              args.memo, parse_workers):
+        results.append(result)
+        if result['error']:
+            print(f"{result['filename']}: ERROR {result['error']}", file=sys.stderr)
+        else:
+            print(f"{result['filename']}: {result['parts']} ADIN parts, "
+                  f"total cost {result['total_cost']:.2f} -> {result['output']}")
+        if args.timings:
+            write_stage_log(args.timings, result['stages'], filename=result['filename'], error=result['error'])
+
+    if profiler is not None:
+        profiler.stop()
+        print(f"Profile written to {args.profile}")
+
+    failed = sum(1 for r in results if r['error'])
+    print(f"GRAND TOTAL: {sum(r['total_cost'] for r in results):.2f} "
+          f"({len(results) - failed} files priced, {failed} failed)")
+
+    if args.report:
+        write_grand_total_report(args.report, results)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
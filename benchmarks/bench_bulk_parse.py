@@ -0,0 +1,80 @@
+"""Differential check and timing of the pandas bulk parser.
+
+A synthetic parts list over BULK_MIN_BYTES, and copies of it with the
+lines only the line by line parser reads (or that pandas rejects) added,
+must give exactly the same quantity table from build_quantity_table_from_file
+and from each whole-file byte range as from the line by line parser.
+
+Usage: python benchmarks/bench_bulk_parse.py [ADIN rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+from bench_parallel_parse import table_columns
+from generate import generate_parts_list
+from parallel_parse import build_quantity_table_from_file, parse_byte_range
+
+ADIN_ROW = b'ADIN7\tBase unit\t\t600\t560\t720\t0\t0\t0\t0.00\tMO1\tTYPE\tTISAN\t10001\t1\n'
+
+# Name and (prefix, suffix) added around the generated parts list
+EDGE_CASES = [
+    ('plain', b'', b''),
+    ('wide first line', b'\t'.join([b'HEADER'] * 16) + b'\n', b''),
+    ('wide ADIN line', b'', ADIN_ROW.replace(b'\t1\n', b'\t1\tx\tx\n')),
+    ('blank first field', b'', b'\tADIN7\tBase unit\t\t600\t560\t720\t0\t0\t0\t0.00\tMO1\tTYPE\tTISAN\t10001\n'),
+    ('blank columns 13 and 14', b'', ADIN_ROW.replace(b'\tTISAN\t10001\t1\n', b'\tTISAN\t\t\n')),
+    ('short ADIN line', b'', b'ADIN7\tBase unit\t\t600\t560\n'),
+    ('bad number', b'', ADIN_ROW.replace(b'\t600\t', b'\t6o0\t')),
+    ('non-ASCII door model', b'', ADIN_ROW.replace(b'MO1', 'MÖ1'.encode('utf-8'))),
+    ('byte order mark', b'\xef\xbb\xbf', b''),
+]
+
+
+def check_case(name: str, filename: str, data: bytes):
+    """Raise if the bulk paths differ from the line by line parser on one file"""
+    with open(filename, 'wb') as f:
+        f.write(data)
+    expected = table_columns(engine.build_quantity_table(engine.iter_parts_list(filename)))
+
+    if table_columns(build_quantity_table_from_file(filename)) != expected:
+        raise SystemExit(f"{name}: build_quantity_table_from_file differs from the line by line parser")
+    if table_columns(parse_byte_range(filename, 0, os.path.getsize(filename))) != expected:
+        raise SystemExit(f"{name}: parse_byte_range differs from the line by line parser")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        parts_list = os.path.join(directory, 'parts.txt')
+        generate_parts_list(parts_list, rows)
+        with open(parts_list, 'rb') as f:
+            data = f.read()
+
+        for name, prefix, suffix in EDGE_CASES:
+            middle = data.index(b'\n', len(data) // 2) + 1
+            check_case(name, os.path.join(directory, 'edge.txt'), prefix + data[:middle] + suffix + data[middle:])
+            print(f"differential check: {name} identical")
+        check_case('CRLF line endings', os.path.join(directory, 'crlf.txt'), data.replace(b'\n', b'\r\n'))
+        print("differential check: CRLF line endings identical")
+
+        start = time.perf_counter()
+        engine.build_quantity_table(engine.iter_parts_list(parts_list))
+        line_by_line = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_quantity_table_from_file(parts_list)
+        bulk = time.perf_counter() - start
+
+    print(f"{rows:,} ADIN rows, {len(data) / (1024 * 1024):,.0f} MB")
+    print(f"line by line: {line_by_line * 1000:,.0f} ms")
+    print(f"bulk: {bulk * 1000:,.0f} ms ({line_by_line / bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
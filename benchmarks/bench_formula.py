@@ -0,0 +1,136 @@
+"""Rows/sec of calculate_formula before and after the prefix dispatch.
+
+Usage: python benchmarks/bench_formula.py [row count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+
+# One type string per formula branch, plus a few that match no formula
+SAMPLE_TYPES = ['Base unit', 'Tall unit 2D', 'Wall unit 1D', 'NAMA U SADE', 'NAMA L', 'Nama16 1w 1l',
+                'NAMA 16', 'NAMA 32', 'NAMA CNC', 'NAMA ver 16', 'NAMA ver 32', 'NAMA hor with light',
+                'NAMA ver with light', 'Open shelf', 'Shelf 2', 'SAFHE 60', 'Safhe 65', 'Safhe 75',
+                'Safhe 90', 'Safhe 100', 'Safhe 120', 'Ward 2D', 'Kesho 1', 'Kesho 4', 'Tabaghe 1',
+                'Tabaghe 3', 'TABAGHE6', 'Tabaghe', 'B-2E', 'Pakhor mdf', 'SAFHE 1LAB']
+
+
+def legacy_calculate_formula(part_type: str, L: float, P: float, H: float) -> float:
+    """The if/elif chain calculate_formula used before the prefix dispatch"""
+    L = L / 1000
+    P = P / 1000
+    H = H / 1000
+
+    part_type = part_type.upper()
+
+    if part_type.startswith('BASE') or part_type.startswith('TALL'):
+        return P * (H / 0.72) * L
+    elif part_type.startswith('WALL'):
+        if H <= 0.40:
+            factor_h = 0.25
+        elif H <= 0.50:
+            factor_h = 0.30
+        elif H <= 0.60:
+            factor_h = 0.35
+        elif H <= 0.70:
+            factor_h = 0.40
+        else:
+            factor_h = 0.40 + (H - 0.70)
+        factor_p = (P - 0.30) / 2
+        return (factor_h + factor_p) * L
+    elif part_type.startswith('NAMA U'):
+        return (P + L + 0.08) * H
+    elif part_type.startswith('NAMA L'):
+        return (P + L) * H
+    elif part_type.startswith('NAMA 16') or part_type.startswith('NAMA16'):
+        return H * P
+    elif part_type.startswith('NAMA 32'):
+        return H * P * 2
+    elif part_type.startswith('NAMA CNC'):
+        return L * P * 2
+    elif part_type.startswith('NAMA VER 16'):
+        return L * P
+    elif part_type.startswith('NAMA VER 32'):
+        return L * P * 2
+    elif part_type.startswith('NAMA HOR WITH LIGHT'):
+        factor_light = 0.55
+        return L * P + L * factor_light
+    elif part_type.startswith('NAMA VER WITH LIGHT'):
+        factor_light = 0.55
+        return H * P + H * factor_light
+    elif part_type.startswith('OPEN SHELF'):
+        return (L * P) * 2 + (H * P) * 2 + (L * H)
+    elif part_type.startswith('SHELF'):
+        factor_farsi = 2 * (2 * P + L + H)
+        return (L * P) * 2 + (H * P) * 2 + (L * H) * 2 + factor_farsi
+    elif any(part_type.startswith(f'SAFHE {x}') for x in ['60', '65', '75', '90', '100', '120']):
+        return L * 1000
+    elif part_type.startswith('WARD'):
+        if P <= 0.30:
+            factor_p = 0.45
+        elif P <= 0.40:
+            factor_p = 0.50
+        elif P <= 0.50:
+            factor_p = 0.55
+        elif P <= 0.60:
+            factor_p = 0.60
+        elif P <= 0.70:
+            factor_p = 0.65
+        elif P <= 0.80:
+            factor_p = 0.70
+        elif P <= 0.90:
+            factor_p = 0.75
+        elif P <= 1.00:
+            factor_p = 0.80
+        elif P <= 1.10:
+            factor_p = 0.85
+        else:
+            factor_p = 0.90
+        return L * H * factor_p
+    elif part_type.startswith('KESHO'):
+        return P * (H / 0.72) * L * 2
+    elif part_type.startswith('TABAGHE'):
+        for i in range(1, 7):
+            if f'TABAGHE {i}' in part_type.upper() or f'TABAGHE{i}' in part_type.upper():
+                return L * P * H * i
+
+    return 0.0
+
+
+def synthetic_rows(count: int, seed: int = 1):
+    """Random (type, L, P, H) rows in millimeters"""
+    rng = random.Random(seed)
+    return [(rng.choice(SAMPLE_TYPES), float(rng.randint(0, 3000)),
+             float(rng.randint(0, 1300)), float(rng.randint(0, 2600)))
+            for _ in range(count)]
+
+
+def rows_per_second(formula, rows) -> float:
+    start = time.perf_counter()
+    for part_type, L, P, H in rows:
+        formula(part_type, L, P, H)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = synthetic_rows(count)
+
+    # Both implementations must agree before their speed is compared
+    for part_type, L, P, H in rows[:100_000]:
+        if legacy_calculate_formula(part_type, L, P, H) != engine.calculate_formula(part_type, L, P, H):
+            raise SystemExit(f"Mismatch for {part_type!r} {L} {P} {H}")
+
+    before = rows_per_second(legacy_calculate_formula, rows)
+    after = rows_per_second(engine.calculate_formula, rows)
+    print(f"rows: {count}")
+    print(f"before (if/elif chain):  {before:,.0f} rows/sec")
+    print(f"after (prefix dispatch): {after:,.0f} rows/sec ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
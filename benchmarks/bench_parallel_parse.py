@@ -0,0 +1,59 @@
+"""Speedup of parsing one large parts list across 1-16 worker processes.
+
+Every worker count must give exactly the same quantity table and summary
+as the single-process parser before its time is reported.
+
+Usage: python benchmarks/bench_parallel_parse.py [ADIN rows] [--workers 1 2 4 8 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+from generate import generate_parts_list
+from parallel_parse import load_quantity_table_parallel
+
+
+def table_columns(quantity_table: engine.QuantityTable):
+    return [quantity_table.types.values, quantity_table.types.codes, quantity_table.L, quantity_table.P,
+            quantity_table.H, quantity_table.door_models.values, quantity_table.door_models.codes,
+            quantity_table.color_categories.values, quantity_table.color_categories.codes,
+            quantity_table.color_codes.values, quantity_table.color_codes.codes, quantity_table.outputs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('rows', type=int, nargs='?', default=2_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        parts_list = os.path.join(directory, 'parts.txt')
+        generate_parts_list(parts_list, args.rows)
+        size = os.path.getsize(parts_list)
+        print(f"{args.rows:,} ADIN rows, {size / (1024 * 1024):,.0f} MB, {os.cpu_count()} CPU cores")
+
+        start = time.perf_counter()
+        expected = engine.build_quantity_table(engine.iter_parts_list(parts_list))
+        single = time.perf_counter() - start
+        expected_columns = table_columns(expected)
+        expected_summary = engine.build_summary_table(expected)
+        print(f"single process: {single:.2f} s")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            quantity_table = load_quantity_table_parallel(parts_list, workers)
+            elapsed = time.perf_counter() - start
+
+            if (table_columns(quantity_table) != expected_columns or
+                    engine.build_summary_table(quantity_table) != expected_summary):
+                raise SystemExit(f"{workers} workers: output differs from the single-process parser")
+            print(f"{workers:>2} workers: {elapsed:.2f} s ({single / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
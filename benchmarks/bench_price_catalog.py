@@ -0,0 +1,93 @@
+"""Price table editor operations on a large catalog: load, search, patch and save.
+
+Before timing, a patch that fails to read partway through (a bad byte at
+its end) must raise and leave the catalog exactly as it was, unmodified,
+and a saved catalog must read back with the same rows.
+
+Usage: python benchmarks/bench_price_catalog.py [price rows]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+from generate import generate_price_table
+from price_catalog import PriceCatalog
+
+
+def write_patch(filename: str, rows: int, bad_tail: bool = False):
+    """A patch that changes the first price of rows existing rows and adds as many new ones"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(engine.PRICE_TABLE_HEADERS[:4])
+        for i in range(rows):
+            writer.writerow([f'XMO{i % 500}', f'XCAT{i // 500}', str(50000 + i), '1'])
+            writer.writerow([f'NEW{i}', '', '', '2'])
+    if bad_tail:
+        with open(filename, 'ab') as f:
+            f.write(b'NEW,,,\xff\n')
+
+
+def check_failed_patch(price_table: str, patch: str):
+    """Raise if a patch that fails partway through changes the catalog"""
+    catalog = PriceCatalog.load(price_table)
+    before = [list(row) for row in catalog.rows]
+    catalog.search('XMO1')
+
+    try:
+        catalog.apply_patch(patch)
+    except UnicodeDecodeError:
+        pass
+    else:
+        raise SystemExit("A patch with a bad byte was applied")
+
+    if catalog.rows != before or catalog.modified or catalog.search('NEW') != []:
+        raise SystemExit("A failed patch changed the catalog")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        price_table = os.path.join(directory, 'prices.csv')
+        patch = os.path.join(directory, 'patch.csv')
+        generate_price_table(price_table, extra_rows=rows)
+
+        write_patch(patch, rows // 2, bad_tail=True)
+        check_failed_patch(price_table, patch)
+        print("failed patch: catalog unchanged")
+        write_patch(patch, rows // 2)
+
+        start = time.perf_counter()
+        catalog = PriceCatalog.load(price_table)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = catalog.search('XMO1 XCAT')
+        search = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = catalog.apply_patch(patch)
+        apply = time.perf_counter() - start
+
+        start = time.perf_counter()
+        catalog.save(price_table)
+        save = time.perf_counter() - start
+
+        if PriceCatalog.load(price_table).rows != catalog.rows:
+            raise SystemExit("The saved catalog reads back differently")
+
+    print(f"{len(catalog.rows) - result['added']:,} price rows, patch of {result['updated']:,} updates "
+          f"and {result['added']:,} new rows")
+    print(f"load: {load * 1000:,.0f} ms")
+    print(f"search: {search * 1000:,.1f} ms ({len(matches):,} matches)")
+    print(f"apply patch: {apply * 1000:,.0f} ms")
+    print(f"save: {save * 1000:,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
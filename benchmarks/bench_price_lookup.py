@@ -0,0 +1,105 @@
+"""Unit price lookups/sec: linear scan of the price rows vs the hashed index.
+
+The table also has a wildcard row for every door model (blank color
+category and code); lookups of unknown colors fall back to it.
+
+Usage: python benchmarks/bench_price_lookup.py [price rows]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+
+SUMMARY_TYPES = list(engine.TYPE_TO_PRICE_COLUMN)
+
+
+def write_price_table(filename: str, count: int, seed: int = 1):
+    """Write a synthetic price table with count distinct model/color/code rows"""
+    rng = random.Random(seed)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(engine.PRICE_TABLE_HEADERS)
+        for i in range(count):
+            writer.writerow([f'MO{i % 500}', f'CAT{i // 500}', f'{10000 + i}'] +
+                            [str(rng.randint(100, 2000)) for _ in range(13)] + ['Synthetic'])
+        for model in range(500):
+            writer.writerow([f'MO{model}', '', ''] + [str(rng.randint(100, 2000)) for _ in range(13)] +
+                            ['Any color'])
+
+
+def legacy_get_unit_price(part_type, door_model, color_category, color_code, price_data):
+    """The linear scan get_unit_price used before the index"""
+    price_column = engine.TYPE_TO_PRICE_COLUMN.get(part_type, '')
+    if not price_column:
+        return 0.0
+    for row in price_data:
+        if (row.get('Door model', '').upper() == door_model.upper() and
+            row.get('Color category', '').upper() == color_category.upper() and
+            row.get('Color code', '').upper() == color_code.upper()):
+            try:
+                return float(row.get(price_column, 0))
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rng = random.Random(2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'price_table.csv')
+        write_price_table(filename, count)
+
+        start = time.perf_counter()
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            price_rows = list(csv.DictReader(f))
+        legacy_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        price_index = engine.load_price_table(filename)
+        index_load = time.perf_counter() - start
+
+    lookups = []
+    for _ in range(2000):
+        i = rng.randrange(count)
+        lookups.append((rng.choice(SUMMARY_TYPES), f'mo{i % 500}', f'cat{i // 500}', f'{10000 + i}'))
+
+    # Both lookups must agree before their speed is compared
+    for lookup in lookups[:50]:
+        if legacy_get_unit_price(*lookup, price_rows) != engine.get_unit_price(*lookup, price_index):
+            raise SystemExit(f"Mismatch for {lookup}")
+
+    legacy_lookups = lookups[:200]
+    start = time.perf_counter()
+    for lookup in legacy_lookups:
+        legacy_get_unit_price(*lookup, price_rows)
+    legacy = len(legacy_lookups) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for lookup in lookups:
+        engine.get_unit_price(*lookup, price_index)
+    indexed = len(lookups) / (time.perf_counter() - start)
+
+    fallback_lookups = [(part_type, door_model, color_category, 'unknown')
+                        for part_type, door_model, color_category, _ in lookups]
+    start = time.perf_counter()
+    for lookup in fallback_lookups:
+        engine.get_unit_price(*lookup, price_index)
+    fallback = len(fallback_lookups) / (time.perf_counter() - start)
+
+    print(f"price rows: {count}")
+    print(f"load: csv.DictReader {legacy_load * 1000:.0f} ms, indexed {index_load * 1000:.0f} ms")
+    print(f"linear scan: {legacy:,.0f} lookups/sec")
+    print(f"hash index:  {indexed:,.0f} lookups/sec ({indexed / legacy:,.0f}x)")
+    print(f"wildcard fallback: {fallback:,.0f} lookups/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""What-if repricing: one summary table under many price tables.
+
+Every scenario total from scenarios.price_scenarios must equal the
+total_cost of build_cost_table with the same price table before the two
+are timed. Loading the price table CSVs is timed separately.
+
+Usage: python benchmarks/bench_scenarios.py [scenarios] [--rows 100000] [--models 20] [--colors 12]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+from generate import generate_parts_list, generate_price_table
+from scenarios import price_scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenarios', type=int, nargs='?', default=300)
+    parser.add_argument('--rows', type=int, default=100_000, help="ADIN rows in the parts list")
+    parser.add_argument('--models', type=int, default=20, help="Door models in the parts list")
+    parser.add_argument('--colors', type=int, default=12, help="Color combinations per door model")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        parts_list = os.path.join(directory, 'parts.txt')
+        generate_parts_list(parts_list, args.rows, models=args.models, colors=args.colors)
+        summary = engine.PricingEngine().price_file(parts_list)['summary_table']
+
+        paths = []
+        for seed in range(args.scenarios):
+            paths.append(os.path.join(directory, f'prices_{seed}.csv'))
+            generate_price_table(paths[-1], args.models, args.colors, seed=seed)
+
+        start = time.perf_counter()
+        price_tables = [engine.load_price_table(path) for path in paths]
+        load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = price_scenarios(summary, price_tables)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [engine.build_cost_table(summary, price_data)[1] for price_data in price_tables]
+    one_by_one = time.perf_counter() - start
+
+    if result['totals'].tolist() != expected:
+        raise SystemExit("Scenario totals differ from build_cost_table")
+
+    print(f"{len(summary):,} summary rows, {args.scenarios} scenarios")
+    print(f"load price tables: {load * 1000:,.0f} ms")
+    print(f"build_cost_table per scenario: {one_by_one * 1000:,.0f} ms")
+    print(f"price_scenarios: {vectorized * 1000:,.0f} ms ({one_by_one / vectorized:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cold start of the command line entry points.
+
+For each entry point this reports the import time (python -X importtime)
+with its slowest imports, checks that no GUI or NumPy/pandas modules are
+loaded, and times a complete single-file batch.py run in a fresh process.
+Fails if the median run takes longer than --budget milliseconds.
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--budget 200]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Entry points that must start without these modules
+CLI_MODULES = ['batch', 'rollup', 'watch', 'scenarios']
+HEAVY_MODULES = ['tkinter', 'numpy', 'pandas']
+
+
+def import_times(module: str) -> List[Tuple[int, str]]:
+    """Cumulative import time in microseconds of every module module imports, slowest first"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=ROOT)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times.append((int(cumulative), name.strip()))
+    return sorted(times, reverse=True)
+
+
+def heavy_imports(module: str) -> List[str]:
+    """Heavy modules loaded by importing module"""
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT)
+    return result.stdout.split()
+
+
+def cold_start_ms(runs: int) -> float:
+    """Median wall time of pricing one small parts list with batch.py in a new process"""
+    from generate import generate_parts_list, generate_price_table
+
+    with tempfile.TemporaryDirectory() as directory:
+        parts_list = os.path.join(directory, 'parts.txt')
+        price_table = os.path.join(directory, 'prices.csv')
+        generate_parts_list(parts_list, 150)
+        generate_price_table(price_table)
+
+        command = [sys.executable, os.path.join(ROOT, 'batch.py'), parts_list, '--price-table', price_table]
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, check=True, cwd=ROOT)
+            times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def measure(runs: int = 10) -> Dict:
+    """Startup results, in the form used by run_benchmarks.py"""
+    return {
+        'import_ms': {module: import_times(module)[0][0] / 1000 for module in CLI_MODULES},
+        'heavy_imports': {module: heavy_imports(module) for module in CLI_MODULES},
+        'cold_start_ms': cold_start_ms(runs)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold start of the command line entry points")
+    parser.add_argument('--runs', type=int, default=10, help="Fresh batch.py runs to time")
+    parser.add_argument('--budget', type=float, default=200.0, help="Largest acceptable median run, in ms")
+    args = parser.parse_args()
+
+    failed = False
+    for module in CLI_MODULES:
+        times = import_times(module)
+        print(f"import {module}: {times[0][0] / 1000:.1f} ms; slowest: " +
+              ', '.join(f"{name} {us / 1000:.1f}" for us, name in times[1:6]))
+        heavy = heavy_imports(module)
+        if heavy:
+            print(f"  loads {', '.join(heavy)} at import")
+            failed = True
+
+    median = cold_start_ms(args.runs)
+    print(f"batch.py single-file run: {median:.0f} ms median of {args.runs} (budget {args.budget:.0f} ms)")
+    return 1 if failed or median > args.budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
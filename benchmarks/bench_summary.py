@@ -0,0 +1,55 @@
+"""Summary group-by: per-row dict loop over quantity rows vs QuantityTable.aggregate.
+
+Both paths must give the same summary totals before they are timed.
+
+Usage: python benchmarks/bench_summary.py [row count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+from bench_formula import SAMPLE_TYPES
+
+DOOR_MODELS = [f'MO{i}' for i in range(1, 40)]
+COLOR_CATEGORIES = ['', 'TISAN', 'HIGH GLOSS', 'MDF']
+COLOR_CODES = [''] + [str(10000 + i) for i in range(60)]
+
+
+def synthetic_table(count: int, seed: int = 1) -> engine.QuantityTable:
+    """Random quantity table rows with realistic group cardinality"""
+    rng = random.Random(seed)
+    parts = [(rng.choice(SAMPLE_TYPES), str(rng.randint(0, 3000)), str(rng.randint(0, 1300)),
+              str(rng.randint(0, 2600)), rng.choice(DOOR_MODELS), rng.choice(COLOR_CATEGORIES),
+              rng.choice(COLOR_CODES))
+             for _ in range(count)]
+    return engine.build_quantity_table(parts)
+
+
+def seconds(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    table = synthetic_table(count)
+    rows = [table[i] for i in range(len(table))]
+
+    legacy = engine.build_summary_table(rows)
+    if engine.summary_rows(table.summarize()[0]) != legacy:
+        raise SystemExit("Grouped summary differs from the per-row loop")
+    print(f"summary check: {len(legacy)} groups identical")
+
+    before = seconds(engine.build_summary_table, rows)
+    after = seconds(table.aggregate)
+    print(f"per-row loop: {count / before:,.0f} rows/sec")
+    print(f"aggregate:    {count / after:,.0f} rows/sec ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Differential check and timing of the NumPy formula path.
+
+Every row of a synthetic table, including the piecewise factor boundaries,
+must give exactly the same output from calculate_formula_array as from the
+scalar calculate_formula.
+
+Usage: python benchmarks/bench_vectorized.py [row count]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+from vectorized import calculate_formula_array
+from bench_formula import SAMPLE_TYPES, synthetic_rows
+
+# Factor table boundaries in mm, with values just either side of each one
+BOUNDARIES = [300, 400, 500, 600, 700, 800, 900, 1000, 1100]
+
+
+def boundary_rows():
+    rows = []
+    for part_type in SAMPLE_TYPES:
+        for value in BOUNDARIES:
+            for mm in (value - 0.001, value, value + 0.001):
+                rows.append((part_type, 1000.0, mm, 720.0))
+                rows.append((part_type, 1000.0, 350.0, mm))
+        rows.append((part_type, 0.0, 0.0, 0.0))
+    return rows
+
+
+def check_vectorized(rows):
+    """Raise if the array path differs from the scalar path on any row"""
+    part_types, L, P, H = zip(*rows)
+    outputs = calculate_formula_array(part_types, L, P, H).tolist()
+
+    for row, output in zip(rows, outputs):
+        expected = engine.calculate_formula(*row)
+        if output != expected:
+            raise SystemExit(f"Mismatch for {row}: {output!r} != {expected!r}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = synthetic_rows(count)
+    rows.extend(boundary_rows())
+    random.Random(2).shuffle(rows)
+
+    check_vectorized(rows)
+    print(f"differential check: {len(rows)} rows identical")
+
+    part_types, L, P, H = zip(*rows)
+
+    start = time.perf_counter()
+    for row in rows:
+        engine.calculate_formula(*row)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calculate_formula_array(part_types, L, P, H)
+    vectorized = time.perf_counter() - start
+
+    print(f"scalar:     {len(rows) / scalar:,.0f} rows/sec")
+    print(f"vectorized: {len(rows) / vectorized:,.0f} rows/sec ({scalar / vectorized:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Synthetic parts lists and price tables of any size.
+
+Parts lists are tab-separated like the CAD export: ADIN rows carry a type
+from a configurable mix covering every type in specs.md, mixed with non-ADIN
+rows that the parser skips. Price tables hold a row for every door model,
+color category and color code combination the parts lists use.
+
+Usage: python benchmarks/generate.py ROWS parts_list.txt [--price-table price_table.csv]
+                                     [--mix "Base unit=5" --mix "Ward 2D=2" ...]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+
+# Relative frequency of each type, roughly as they occur in kitchen and wardrobe projects
+DEFAULT_MIX = {
+    'Base unit': 12, 'Base 2D': 6, 'Tall unit 2D': 4, 'Wall unit 1D': 10, 'Wall 2D': 5,
+    'NAMA U DARB': 6, 'NAMA L': 4, 'NAMA 16': 4, 'Nama16 1w 1l': 2, 'NAMA 32': 2, 'NAMA CNC': 1,
+    'NAMA ver 16': 2, 'NAMA ver 32': 1, 'NAMA hor with light': 1, 'NAMA ver with light': 1,
+    'SAFHE 60': 2, 'Safhe 65': 1, 'Safhe 75': 1, 'Safhe 90': 1, 'Safhe 100': 1, 'Safhe 120': 1,
+    'Ward 2D': 5, 'Open shelf': 2, 'Shelf 2': 2, 'Kesho 1': 2, 'Kesho 2': 1, 'Kesho 3': 1, 'Kesho 4': 1,
+    'Tabaghe 1': 1, 'Tabaghe 2': 1, 'Tabaghe 3': 1, 'Tabaghe 4': 1, 'Tabaghe 5': 1, 'TABAGHE6': 1,
+    'Pakhor mdf': 6, 'B-2E': 2
+}
+
+# Size ranges in mm (L, P, H) by type prefix; other types use the last entry
+SIZE_RANGES = [
+    ('BASE', (300, 1200), (300, 650), (600, 900)),
+    ('TALL', (300, 900), (300, 650), (1800, 2600)),
+    ('WALL', (300, 1200), (250, 400), (300, 1000)),
+    ('WARD', (400, 2400), (300, 1200), (1800, 2700)),
+    ('SAFHE', (600, 3000), (600, 1200), (10, 40)),
+    ('', (16, 2400), (16, 900), (16, 2600)),
+]
+
+# Non-ADIN rows from the sample export, mixed in between the ADIN rows
+OTHER_ROWS = [
+    ['@FORMES', 'PLAN1', '', '20718', '18036', '1', '-10641', '-10032', '0', '0.00', '', '', '', '', '1'],
+    ['@IRCAT', 'LAMPUNDERCAB100D', '', '1000', '40', '10', '158', '1121', '2510', '0.00', '', '', '', '10051', '1'],
+    ['GEDECOV3', '_FOCO', '', '100', '100', '10', '1361', '661', '2510', '180.00', '', '', '', '', '1'],
+]
+
+
+def parse_mix(entries: List[str]) -> Dict[str, float]:
+    """Parse TYPE=WEIGHT entries into a type mix"""
+    mix = {}
+    for entry in entries:
+        part_type, _, weight = entry.rpartition('=')
+        if not part_type:
+            raise ValueError(f"Expected TYPE=WEIGHT, got {entry!r}")
+        mix[part_type] = float(weight)
+    return mix
+
+
+def door_colors(models: int, colors: int) -> List[Tuple[str, str, str]]:
+    """Door model, color category and color code combinations used by generated lists"""
+    categories = ['', 'TISAN', 'HIGH GLOSS', 'MDF']
+    return [(f'MO{model}', categories[color % len(categories)], str(10000 + color) if color % 3 else '')
+            for model in range(1, models + 1) for color in range(colors)]
+
+
+def size_range(part_type: str):
+    upper = part_type.upper()
+    for prefix, L, P, H in SIZE_RANGES:
+        if upper.startswith(prefix):
+            return L, P, H
+
+
+def generate_parts_list(filename: str, rows: int, mix: Dict[str, float] = None, seed: int = 1,
+                        other_fraction: float = 0.4, models: int = 20, colors: int = 12):
+    """Write a parts list with rows ADIN rows, plus other_fraction as many non-ADIN rows"""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    types = list(mix)
+    weights = list(mix.values())
+    combinations = door_colors(models, colors)
+
+    with open(filename, 'w', encoding='utf-8', newline='\n') as f:
+        written = 0
+        while written < rows:
+            if rng.random() < other_fraction:
+                f.write('\t'.join(rng.choice(OTHER_ROWS)) + '\n')
+                continue
+
+            part_type = rng.choices(types, weights)[0]
+            L, P, H = (rng.randint(*bounds) for bounds in size_range(part_type))
+            door_model, color_category, color_code = rng.choice(combinations)
+            f.write('\t'.join(['ADIN7', part_type, rng.choice(['', 'R', 'L']), str(L), str(P), str(H),
+                               str(rng.randint(-3000, 3000)), str(rng.randint(-3000, 3000)), '0',
+                               rng.choice(['0.00', '90.00', '180.00', '270.00']), door_model, 'TYPE',
+                               color_category, color_code, '1']) + '\n')
+            written += 1
+
+
+def generate_price_table(filename: str, models: int = 20, colors: int = 12, extra_rows: int = 0, seed: int = 1):
+    """Write a price table with a row for every generated combination, plus extra unused rows"""
+    rng = random.Random(seed)
+    price_columns = len(engine.PRICE_TABLE_HEADERS) - 4
+
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(engine.PRICE_TABLE_HEADERS)
+        for door_model, color_category, color_code in door_colors(models, colors):
+            writer.writerow([door_model, color_category, color_code] +
+                            [str(rng.randint(100, 2000)) for _ in range(price_columns)] + ['Synthetic'])
+        for i in range(extra_rows):
+            writer.writerow([f'XMO{i % 500}', f'XCAT{i // 500}', str(50000 + i)] +
+                            [str(rng.randint(100, 2000)) for _ in range(price_columns)] + ['Unused'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic parts list")
+    parser.add_argument('rows', type=int, help="Number of ADIN rows")
+    parser.add_argument('output', help="Parts list file to write")
+    parser.add_argument('--price-table', help="Also write a matching price table CSV")
+    parser.add_argument('--extra-price-rows', type=int, default=0, help="Unused rows added to the price table")
+    parser.add_argument('--mix', action='append', default=[],
+                        help="TYPE=WEIGHT, repeatable; replaces the default type mix")
+    parser.add_argument('--models', type=int, default=20, help="Number of door models")
+    parser.add_argument('--colors', type=int, default=12, help="Color combinations per door model")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    generate_parts_list(args.output, args.rows, parse_mix(args.mix), args.seed,
+                        models=args.models, colors=args.colors)
+    if args.price_table:
+        generate_price_table(args.price_table, args.models, args.colors, args.extra_price_rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
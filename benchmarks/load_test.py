@@ -0,0 +1,119 @@
+"""Load test of the local pricing service: p50/p99 latency and requests/sec.
+
+Starts server.py on a free port unless --url points at a running server,
+then POSTs the same parts list from several client threads.
+
+Usage: python benchmarks/load_test.py PARTS_LIST [--requests N] [--concurrency N] [--workers N] [--url URL]
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(host: str, port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"Server on {host}:{port} did not start")
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_clients(host: str, port: int, path: str, body: bytes, requests: int, concurrency: int):
+    """Send requests from concurrency threads, each on its own keep-alive connection"""
+    latencies = []
+    errors = []
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client():
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            start = time.perf_counter()
+            connection.request('POST', path, body, {'Content-Type': 'text/plain; charset=utf-8'})
+            response = connection.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if response.status != 200:
+                    errors.append(response.status)
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('parts_list', help="Parts list file sent as the request body")
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=1, help="--workers of the started server")
+    parser.add_argument('--quantity', action='store_true', help="Include the quantity table in responses")
+    parser.add_argument('--url', help="Existing server, e.g. http://127.0.0.1:8765")
+    args = parser.parse_args()
+
+    with open(args.parts_list, 'rb') as f:
+        body = f.read()
+
+    server = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'server.py'), '--port', str(port),
+                                   '--workers', str(args.workers)], cwd=ROOT, stdout=subprocess.DEVNULL)
+
+    try:
+        wait_for_server(host, port)
+        path = '/price' if args.quantity else '/price?quantity=0'
+        # Warm up connections and caches before measuring
+        run_clients(host, port, path, body, args.concurrency, args.concurrency)
+        latencies, errors, elapsed = run_clients(host, port, path, body, args.requests, args.concurrency)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print(f"{len(latencies)} requests, {args.concurrency} concurrent, {len(body):,} byte body")
+    print(f"p50: {percentile(latencies, 0.50) * 1000:.1f} ms  p99: {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"throughput: {len(latencies) / elapsed:,.1f} requests/sec")
+    if errors:
+        print(f"{len(errors)} failed requests (status {sorted(set(errors))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Time every pipeline stage on synthetic parts lists of several sizes.
+
+Stages: parse (iter_parts_list), quantity (build_quantity_table),
+calculate_formula (row by row), summary (build_summary_table), price_index
+(parse the price table CSV), get_unit_price (one lookup per row), cost
+(build_cost_table), bulk_parse (bulk_parse.load_quantity_table_bulk,
+formulas included), cache_load (warm parts_cache read) and end_to_end
+(PricingEngine.price_file). Each stage is timed separately, best of
+--repeat runs. cold_start is the median single-file batch.py run in a new
+process (see bench_startup.py).
+
+Results are written as JSON with --json. With --compare, each stage is
+checked against an earlier results file and the run fails if any stage got
+slower than --tolerance times its earlier time.
+
+Usage: python benchmarks/run_benchmarks.py [--rows 10000 100000 1000000] [--json results.json]
+                                           [--compare baseline.json] [--tolerance 1.25]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_parse
+import engine
+import parts_cache
+from bench_startup import cold_start_ms
+from generate import generate_parts_list, generate_price_table
+
+
+def best_time(function: Callable, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+
+def run_size(rows: int, directory: str, repeat: int) -> List[Dict]:
+    """Time each stage on a generated parts list with rows ADIN rows"""
+    parts_list = os.path.join(directory, f'parts_{rows}.txt')
+    price_table = os.path.join(directory, f'prices_{rows}.csv')
+    generate_parts_list(parts_list, rows)
+    generate_price_table(price_table, extra_rows=5000)
+
+    parts = engine.read_parts_list(parts_list)
+    quantity_table = engine.build_quantity_table(parts)
+    formula_inputs = [row[:4] for row in quantity_table]
+    summary = engine.build_summary_table(quantity_table)
+    price_data = engine.get_price_table(price_table)
+    lookups = [summary[i % len(summary)] for i in range(rows)]
+    pricing_engine = engine.PricingEngine(price_table)
+    parts_cache.load_quantity_table(parts_list)
+
+    def load_price_index():
+        engine.invalidate_price_table(price_table)
+        engine.get_price_table(price_table)
+
+    def unit_prices():
+        for part_type, door_model, color_category, color_code, _ in lookups:
+            engine.get_unit_price(part_type, door_model, color_category, color_code, price_data)
+
+    def formulas():
+        for part_type, L, P, H in formula_inputs:
+            engine.calculate_formula(part_type, L, P, H)
+
+    stages = [
+        ('parse', rows, lambda: engine.read_parts_list(parts_list)),
+        ('quantity', rows, lambda: engine.build_quantity_table(parts)),
+        ('calculate_formula', rows, formulas),
+        ('summary', rows, lambda: engine.build_summary_table(quantity_table)),
+        ('price_index', len(price_data), load_price_index),
+        ('get_unit_price', rows, unit_prices),
+        ('cost', len(summary), lambda: engine.build_cost_table(summary, price_data)),
+        ('bulk_parse', rows, lambda: bulk_parse.load_quantity_table_bulk(parts_list)),
+        ('cache_load', rows, lambda: parts_cache.load_quantity_table(parts_list)),
+        ('end_to_end', rows, lambda: pricing_engine.price_file(parts_list)),
+    ]
+
+    results = []
+    for stage, items, function in stages:
+        seconds = best_time(function, repeat)
+        results.append({'stage': stage, 'rows': rows, 'items': items, 'seconds': seconds,
+                        'items_per_second': items / seconds if seconds else 0.0})
+        print(f"{rows:>10,} {stage:<18} {seconds * 1000:>10.1f} ms {results[-1]['items_per_second']:>14,.0f}/s")
+    return results
+
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> int:
+    """Print each stage's time against a baseline run; return 1 if any regressed"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['rows'], r['stage']): r['seconds'] for r in json.load(f)['results']}
+
+    regressed = 0
+    for result in results:
+        before = baseline.get((result['rows'], result['stage']))
+        if not before:
+            continue
+        ratio = result['seconds'] / before
+        marker = '  REGRESSION' if ratio > tolerance else ''
+        regressed += bool(marker)
+        print(f"{result['rows']:>10,} {result['stage']:<18} {ratio:>6.2f}x of baseline{marker}")
+    return 1 if regressed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on synthetic parts lists")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="ADIN row counts to benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the best is reported")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    parser.add_argument('--compare', help="Earlier results JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help="Slowdown against --compare that counts as a regression")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            results.extend(run_size(rows, directory, args.repeat))
+
+    seconds = cold_start_ms(args.repeat * 3) / 1000
+    results.append({'stage': 'cold_start', 'rows': 150, 'items': 1, 'seconds': seconds,
+                    'items_per_second': 1 / seconds})
+    print(f"{150:>10,} {'cold_start':<18} {seconds * 1000:>10.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'commit': git_commit(), 'python': platform.python_version(),
+                       'platform': platform.platform(), 'results': results}, f, indent=2)
+
+    if args.compare:
+        return compare(results, args.compare, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import csv
+from array import array
+from typing import BinaryIO, Callable, Optional
+
+from engine import PARTS_COLUMNS, QuantityTable, StringColumn, calculate_formula, extract_quantity_row
+from instrumentation import StageTimer
+
+# pandas and NumPy are imported where they are used, so the command line
+# tools still start without them
+
+# Files (or byte ranges) at least this large are read with pandas' C parser
+# instead of line by line
+BULK_MIN_BYTES = 8 * 1024 * 1024
+
+# Lines per pandas chunk; progress is reported (and may cancel the load) between chunks
+CHUNK_LINES = 200_000
+
+# The first column for the ADIN filter, the PARTS_COLUMNS, and column 14,
+# which together with column 13 tells whether a row has enough fields
+BULK_COLUMNS = (0,) + PARTS_COLUMNS + (14,)
+
+
+def stripped_codes(values):
+    """Factorize a column of strings; returns the row codes and each distinct value, stripped.
+
+    A parts list has few distinct values per column, so stripping and
+    converting them once per distinct value is what makes this fast.
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values)
+    return codes, [value.strip() for value in uniques]
+
+
+def adin_rows(chunk) -> Optional[object]:
+    """The PARTS_COLUMNS of the ADIN rows in one chunk of the parts list.
+
+    Returns None if the chunk has a line the line by line parser would read
+    differently: one with a blank first field (the parser strips the line
+    first, which shifts its fields) or an ADIN line whose columns 13 and 14
+    are blank (whether it has 14 fields depends on columns not read here).
+    """
+    import numpy as np
+
+    codes, firsts = stripped_codes(chunk[0])
+    blank_first = np.array([not first for first in firsts], dtype=bool)[codes]
+    if blank_first.any():
+        shifted = chunk[blank_first]
+        for column in BULK_COLUMNS[1:]:
+            if any(value.strip() for value in shifted[column]):
+                return None
+
+    chunk = chunk[np.array(['ADIN' in first for first in firsts], dtype=bool)[codes]]
+    has_end = np.zeros(len(chunk), dtype=bool)
+    for column in (13, 14):
+        codes, values = stripped_codes(chunk[column])
+        has_end |= np.array([bool(value) for value in values], dtype=bool)[codes]
+    if not has_end.all():
+        return None
+    return chunk[list(PARTS_COLUMNS)]
+
+
+def string_column(values) -> StringColumn:
+    """Dictionary-encode a column of strings, stripped, in order of first appearance like StringColumn.append"""
+    import numpy as np
+
+    codes, stripped = stripped_codes(values)
+    codes_by_value = {}
+    recode = np.array([codes_by_value.setdefault(value, len(codes_by_value)) for value in stripped], dtype=np.int32)
+    return StringColumn.from_codes(list(codes_by_value), array('i', recode[codes].tobytes()))
+
+
+def float_column(values):
+    """Convert a column of L, P or H strings as extract_quantity_row does: stripped, float(), blank is 0.
+
+    Returns the floats and a mask of the rows that don't parse.
+    """
+    import numpy as np
+
+    codes, stripped = stripped_codes(values)
+    floats = np.zeros(len(stripped))
+    bad = np.zeros(len(stripped), dtype=bool)
+    for value_idx, value in enumerate(stripped):
+        try:
+            floats[value_idx] = float(value) if value else 0
+        except ValueError:
+            bad[value_idx] = True
+    return floats[codes], bad[codes]
+
+
+def read_bulk(f: BinaryIO, calculate: Callable[[str, float, float, float], float] = calculate_formula,
+              progress: Callable[[int, int], None] = None,
+              timer: StageTimer = None) -> Optional[QuantityTable]:
+    """Build the quantity table of a parts list read from a binary file with pandas' C parser.
+
+    Gives exactly the quantity table of build_quantity_table(iter_parts_list())
+    or None, after reading the whole file, if it has lines that only the line
+    by line parser reads correctly (see adin_rows) or that pandas can't read.
+
+    progress, if given, is called after every chunk with the number of bytes
+    and ADIN rows read so far. It may raise to stop reading.
+    """
+    import numpy as np
+    import pandas as pd
+
+    timer = timer if timer is not None else StageTimer()
+
+    with timer.stage('parse (bulk)') as record:
+        chunks = []
+        rows = 0
+        try:
+            reader = pd.read_csv(f, sep='\t', header=None, names=range(15), usecols=BULK_COLUMNS, dtype=object,
+                                 encoding='utf-8', quoting=csv.QUOTE_NONE, na_filter=False, engine='c',
+                                 chunksize=CHUNK_LINES)
+            with reader:
+                for chunk in reader:
+                    chunk = adin_rows(chunk)
+                    if chunk is None:
+                        return None
+                    chunks.append(chunk)
+                    rows += len(chunk)
+                    if progress is not None:
+                        progress(f.tell(), rows)
+        except ValueError:
+            # pandas rejects some files the line by line parser reads, e.g. a
+            # first line with more than 15 fields (ParserError is a ValueError)
+            return None
+
+        if chunks:
+            parts = pd.concat(chunks, ignore_index=True)
+        else:
+            parts = pd.DataFrame({column: pd.Series(dtype=object) for column in PARTS_COLUMNS})
+
+        (L, bad_L), (P, bad_P), (H, bad_H) = (float_column(parts[column]) for column in (3, 4, 5))
+        bad = bad_L | bad_P | bad_H
+        if bad.any():
+            for row_idx in np.flatnonzero(bad):
+                try:
+                    extract_quantity_row(tuple(parts.iloc[row_idx]))
+                except Exception as e:
+                    print(f"Error processing row {row_idx}: {e}")
+            keep = ~bad
+            parts, L, P, H = parts[keep], L[keep], P[keep], H[keep]
+
+        quantity_table = QuantityTable()
+        quantity_table.types = string_column(parts[1])
+        quantity_table.L = array('d', L.tobytes())
+        quantity_table.P = array('d', P.tobytes())
+        quantity_table.H = array('d', H.tobytes())
+        quantity_table.door_models = string_column(parts[10])
+        quantity_table.color_categories = string_column(parts[12])
+        quantity_table.color_codes = string_column(parts[13])
+        quantity_table.outputs = array('d', bytes(8 * len(quantity_table.L)))
+        record['rows'] = len(quantity_table)
+
+    with timer.stage('formulas', len(quantity_table)):
+        quantity_table.calculate_formulas(calculate)
+    return quantity_table
+
+
+def load_quantity_table_bulk(filename: str,
+                             calculate: Callable[[str, float, float, float], float] = calculate_formula,
+                             progress: Callable[[int, int], None] = None,
+                             timer: StageTimer = None) -> Optional[QuantityTable]:
+    """Build the quantity table of a parts list file with pandas' C parser (see read_bulk)"""
+    with open(filename, 'rb') as f:
+        return read_bulk(f, calculate, progress, timer)
@@ -0,0 +1,968 @@
+import csv
+import io
+import os
+from array import array
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Tuple, Iterator, Iterable, Callable, Optional
+
+from instrumentation import StageTimer
+
+# Price table headers, in the order they are written to a new price table
+PRICE_TABLE_HEADERS = ['Door model', 'Color category', 'Color code', 'Cabinet', 'Wardrobe',
+                       'NAMA', 'Safhe 60', 'Safhe 65', 'Safhe 75', 'Safhe 90', 'Safhe 100',
+                       'Safhe 120', 'Open shelf', 'Shelf', 'Kesho', 'Tabaghe', 'Description']
+
+# Type prefixes (upper case) that are grouped together in the summary table
+TYPE_GROUPS = {
+    'BASE': 'Base',
+    'TALL': 'Tall',
+    'WALL': 'Wall',
+    'NAMA': 'NAMA',
+    'SAFHE 60': 'Safhe 60',
+    'SAFHE 65': 'Safhe 65',
+    'SAFHE 75': 'Safhe 75',
+    'SAFHE 90': 'Safhe 90',
+    'SAFHE 100': 'Safhe 100',
+    'SAFHE 120': 'Safhe 120',
+    'WARD': 'Ward',
+    'OPEN SHELF': 'Open shelf',
+    'SHELF': 'Shelf',
+    'KESHO': 'Kesho',
+    'TABAGHE': 'Tabaghe'
+}
+
+# Price table columns that identify a price row
+PRICE_KEY_HEADERS = ('Door model', 'Color category', 'Color code')
+
+# Map normalized part types to price table columns
+TYPE_TO_PRICE_COLUMN = {
+    'Base': 'Cabinet',
+    'Tall': 'Cabinet',
+    'Wall': 'Cabinet',
+    'Ward': 'Wardrobe',
+    'NAMA': 'NAMA',
+    'Safhe 60': 'Safhe 60',
+    'Safhe 65': 'Safhe 65',
+    'Safhe 75': 'Safhe 75',
+    'Safhe 90': 'Safhe 90',
+    'Safhe 100': 'Safhe 100',
+    'Safhe 120': 'Safhe 120',
+    'Open shelf': 'Open shelf',
+    'Shelf': 'Shelf',
+    'Kesho': 'Kesho',
+    'Tabaghe': 'Tabaghe'
+}
+
+# Quantity tables with at least this many rows compute formulas with NumPy
+VECTORIZE_THRESHOLD = 5000
+
+# Number of lines read between progress callbacks while reading a parts list
+PROGRESS_EVERY = 10000
+
+# Parts list columns kept for each ADIN row: type, L, P, H, door model,
+# color category and color code
+PARTS_COLUMNS = (1, 3, 4, 5, 10, 12, 13)
+
+QUANTITY_HEADERS = ["Type", "L (mm)", "P (mm)", "H (mm)", "Door Model",
+                    "Color Category", "Color Code", "Formula Output"]
+SUMMARY_HEADERS = ["Type", "Door Model", "Color Category", "Color Code", "Total Formula Output"]
+SUMMARY_STATS_HEADERS = SUMMARY_HEADERS + ["Rows", "Min Formula Output", "Max Formula Output"]
+COST_HEADERS = ["Type", "Door Model", "Color Category", "Color Code",
+                "Total Formula Output", "Unit Price", "Total Price", "Price Rule"]
+
+
+def initialize_price_table(price_table_path: str):
+    """Create a default price table CSV if it doesn't exist"""
+    if not os.path.exists(price_table_path):
+        with open(price_table_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(PRICE_TABLE_HEADERS)
+            # Add some example rows
+            writer.writerow(['MO1', 'TYPE', 'TISAN', '1000', '1200', '800', '500', '550',
+                             '600', '650', '700', '750', '900', '1100', '1300', '1500', 'Example'])
+            writer.writerow(['MO10', 'TYPE', 'TISAN', '1100', '1300', '850', '520', '570',
+                             '620', '670', '720', '770', '920', '1150', '1350', '1550', 'Example'])
+            writer.writerow(['MO7', 'TYPE', 'TISAN', '1050', '1250', '825', '510', '560',
+                             '610', '660', '710', '760', '910', '1125', '1325', '1525', 'Example'])
+
+
+def iter_parts_list(filename: str, progress: Callable[[int, int], None] = None) -> Iterator[Tuple[str, ...]]:
+    """Stream the ADIN rows of a parts list file.
+
+    Only the first column is looked at before a row is fully split, and only
+    the 7 fields in PARTS_COLUMNS are kept for each row.
+
+    progress, if given, is called every PROGRESS_EVERY lines and at the end
+    with the number of bytes read so far and the number of ADIN rows found.
+    It may raise to stop reading.
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        if progress is None:
+            yield from iter_parts_lines(f)
+        else:
+            # Bytes, not characters, so the count reaches the file size
+            # whatever the encoding and line endings
+            def file_progress(chars_read: int, rows: int):
+                progress(f.buffer.tell(), rows)
+
+            yield from iter_parts_lines(f, file_progress)
+
+
+def iter_parts_lines(lines: Iterable[str], progress: Callable[[int, int], None] = None
+                     ) -> Iterator[Tuple[str, ...]]:
+    """Stream the ADIN rows of parts list text, given line by line (see iter_parts_list).
+
+    progress, if given, is called with the number of characters read so far.
+    """
+    chars_read = 0
+    rows = 0
+
+    for line_idx, line in enumerate(lines, 1):
+        if progress is not None:
+            chars_read += len(line)
+            if line_idx % PROGRESS_EVERY == 0:
+                progress(chars_read, rows)
+
+        line = line.strip()
+        if 'ADIN' not in line.partition('\t')[0]:
+            continue
+        columns = line.split('\t')
+        if len(columns) >= 14:
+            rows += 1
+            yield tuple(columns[i] for i in PARTS_COLUMNS)
+
+    if progress is not None:
+        progress(chars_read, rows)
+
+
+def read_parts_list(filename: str, progress: Callable[[int, int], None] = None) -> List[Tuple[str, ...]]:
+    """Read the ADIN rows of a parts list file"""
+    return list(iter_parts_list(filename, progress))
+
+
+def _cabinet_formula(L: float, P: float, H: float) -> float:
+    return P * (H / 0.72) * L
+
+
+def _wall_formula(L: float, P: float, H: float) -> float:
+    # Calculate Factor_H
+    if H <= 0.40:
+        factor_h = 0.25
+    elif H <= 0.50:
+        factor_h = 0.30
+    elif H <= 0.60:
+        factor_h = 0.35
+    elif H <= 0.70:
+        factor_h = 0.40
+    else:
+        factor_h = 0.40 + (H - 0.70)
+
+    # Calculate Factor_P
+    factor_p = (P - 0.30) / 2
+
+    return (factor_h + factor_p) * L
+
+
+def _nama_u_formula(L: float, P: float, H: float) -> float:
+    return (P + L + 0.08) * H
+
+
+def _nama_l_formula(L: float, P: float, H: float) -> float:
+    return (P + L) * H
+
+
+def _nama_16_formula(L: float, P: float, H: float) -> float:
+    return H * P
+
+
+def _nama_32_formula(L: float, P: float, H: float) -> float:
+    return H * P * 2
+
+
+def _nama_ver_16_formula(L: float, P: float, H: float) -> float:
+    return L * P
+
+
+def _nama_double_formula(L: float, P: float, H: float) -> float:
+    return L * P * 2
+
+
+def _nama_hor_light_formula(L: float, P: float, H: float) -> float:
+    factor_light = 0.55  # 550mm converted to meters
+    return L * P + L * factor_light
+
+
+def _nama_ver_light_formula(L: float, P: float, H: float) -> float:
+    factor_light = 0.55
+    return H * P + H * factor_light
+
+
+def _open_shelf_formula(L: float, P: float, H: float) -> float:
+    return (L * P) * 2 + (H * P) * 2 + (L * H)
+
+
+def _shelf_formula(L: float, P: float, H: float) -> float:
+    factor_farsi = 2 * (2 * P + L + H)
+    return (L * P) * 2 + (H * P) * 2 + (L * H) * 2 + factor_farsi
+
+
+def _safhe_formula(L: float, P: float, H: float) -> float:
+    return L * 1000  # Return in mm for linear measurements
+
+
+def _ward_formula(L: float, P: float, H: float) -> float:
+    if P <= 0.30:
+        factor_p = 0.45
+    elif P <= 0.40:
+        factor_p = 0.50
+    elif P <= 0.50:
+        factor_p = 0.55
+    elif P <= 0.60:
+        factor_p = 0.60
+    elif P <= 0.70:
+        factor_p = 0.65
+    elif P <= 0.80:
+        factor_p = 0.70
+    elif P <= 0.90:
+        factor_p = 0.75
+    elif P <= 1.00:
+        factor_p = 0.80
+    elif P <= 1.10:
+        factor_p = 0.85
+    else:
+        factor_p = 0.90
+    return L * H * factor_p
+
+
+def _kesho_formula(L: float, P: float, H: float) -> float:
+    return P * (H / 0.72) * L * 2
+
+
+def _zero_formula(L: float, P: float, H: float) -> float:
+    return 0.0
+
+
+def tabaghe_multiplier(part_type: str) -> int:
+    """Return the Tabaghe shelf count of an upper case type, or 0 if it has none"""
+    for i in range(1, 7):
+        if f'TABAGHE {i}' in part_type or f'TABAGHE{i}' in part_type:
+            return i
+    return 0
+
+
+def _tabaghe_formula(multiplier: int):
+    def formula(L: float, P: float, H: float) -> float:
+        return L * P * H * multiplier
+    formula.multiplier = multiplier
+    formula.__name__ = f'_tabaghe_{multiplier}_formula'
+    return formula
+
+
+# Formula for each type prefix (upper case), with L, P and H in meters.
+# No prefix is a prefix of another, so the longest match is the only match.
+# TABAGHE is resolved separately because its multiplier comes from the type.
+FORMULA_PREFIXES = {
+    'BASE': _cabinet_formula,
+    'TALL': _cabinet_formula,
+    'WALL': _wall_formula,
+    'NAMA U': _nama_u_formula,
+    'NAMA L': _nama_l_formula,
+    'NAMA 16': _nama_16_formula,
+    'NAMA16': _nama_16_formula,
+    'NAMA 32': _nama_32_formula,
+    'NAMA CNC': _nama_double_formula,
+    'NAMA VER 16': _nama_ver_16_formula,
+    'NAMA VER 32': _nama_double_formula,
+    'NAMA HOR WITH LIGHT': _nama_hor_light_formula,
+    'NAMA VER WITH LIGHT': _nama_ver_light_formula,
+    'OPEN SHELF': _open_shelf_formula,
+    'SHELF': _shelf_formula,
+    'SAFHE 60': _safhe_formula,
+    'SAFHE 65': _safhe_formula,
+    'SAFHE 75': _safhe_formula,
+    'SAFHE 90': _safhe_formula,
+    'SAFHE 100': _safhe_formula,
+    'SAFHE 120': _safhe_formula,
+    'WARD': _ward_formula,
+    'KESHO': _kesho_formula
+}
+
+# Bump whenever a formula changes, so cached formula outputs are recomputed
+FORMULA_VERSION = 1
+
+_FORMULA_PREFIX_LENGTHS = sorted({len(prefix) for prefix in FORMULA_PREFIXES}, reverse=True)
+
+
+@lru_cache(maxsize=4096)
+def resolve_formula(part_type: str):
+    """Resolve the formula function of a part type, once per distinct type string"""
+    part_type = part_type.upper()
+
+    if part_type.startswith('TABAGHE'):
+        multiplier = tabaghe_multiplier(part_type)
+        return _tabaghe_formula(multiplier) if multiplier else _zero_formula
+
+    for length in _FORMULA_PREFIX_LENGTHS:
+        formula = FORMULA_PREFIXES.get(part_type[:length])
+        if formula is not None:
+            return formula
+
+    return _zero_formula
+
+
+def calculate_formula(part_type: str, L: float, P: float, H: float) -> float:
+    """Calculate the formula output based on part type"""
+    # Convert mm to meters
+    return resolve_formula(part_type)(L / 1000, P / 1000, H / 1000)
+
+
+@lru_cache(maxsize=4096)
+def normalize_type(part_type: str) -> str:
+    """Normalize part type for grouping, once per distinct type string"""
+    part_type = part_type.upper()
+
+    for prefix, normalized in TYPE_GROUPS.items():
+        if part_type.startswith(prefix):
+            return normalized
+
+    return part_type
+
+
+def extract_quantity_row(part: Tuple[str, ...]) -> List:
+    """Extract the editable quantity table columns from a parts list row"""
+    part_type = part[0].strip()
+    L = float(part[1].strip()) if part[1].strip() else 0
+    P = float(part[2].strip()) if part[2].strip() else 0
+    H = float(part[3].strip()) if part[3].strip() else 0
+    door_model = part[4].strip()
+    color_category = part[5].strip()
+    color_code = part[6].strip()
+
+    return [part_type, L, P, H, door_model, color_category, color_code]
+
+
+def extract_quantity_rows(parts_data: Iterable[Tuple[str, ...]]) -> Iterator[List]:
+    """Yield the editable quantity table columns, skipping rows that can't be parsed"""
+    for row_idx, part in enumerate(parts_data):
+        try:
+            yield extract_quantity_row(part)
+        except Exception as e:
+            print(f"Error processing row {row_idx}: {e}")
+
+
+def iter_quantity_rows(parts_data: Iterable[Tuple[str, ...]],
+                       calculate: Callable[[str, float, float, float], float] = calculate_formula) -> Iterator[List]:
+    """Yield quantity table rows, including the formula output column"""
+    for row_data in extract_quantity_rows(parts_data):
+        row_data.append(calculate(row_data[0], row_data[1], row_data[2], row_data[3]))
+        yield row_data
+
+
+class StringColumn:
+    """Dictionary-encoded string column.
+
+    Each distinct string is stored once, and every row holds a small integer
+    code into the list of distinct values.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = array('i')
+        self._codes_by_value = {}
+
+    def encode(self, value: str) -> int:
+        """Return the code of a value, adding it to the dictionary if it's new"""
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = self._codes_by_value[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str):
+        self.codes.append(self.encode(value))
+
+    def extend(self, other: 'StringColumn'):
+        """Append the rows of another column, re-coding them into this column's dictionary"""
+        recode = [self.encode(value) for value in other.values]
+        self.codes.extend(array('i', map(recode.__getitem__, other.codes)))
+
+    @classmethod
+    def from_codes(cls, values: List[str], codes: array) -> 'StringColumn':
+        """Build a column from its distinct values and the row codes into them"""
+        column = cls()
+        column.values = values
+        column.codes = codes
+        column._codes_by_value = {value: code for code, value in enumerate(values)}
+        return column
+
+    def __getitem__(self, row_idx: int) -> str:
+        return self.values[self.codes[row_idx]]
+
+    def __setitem__(self, row_idx: int, value: str):
+        self.codes[row_idx] = self.encode(value)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class QuantityTable:
+    """Columnar quantity table.
+
+    L, P, H and formula output are typed double arrays, and type, door model,
+    color category and color code are dictionary-encoded. Indexing returns and
+    accepts rows in the usual list form
+    [part_type, L, P, H, door_model, color_category, color_code, formula_output].
+    """
+
+    def __init__(self):
+        self.types = StringColumn()
+        self.L = array('d')
+        self.P = array('d')
+        self.H = array('d')
+        self.door_models = StringColumn()
+        self.color_categories = StringColumn()
+        self.color_codes = StringColumn()
+        self.outputs = array('d')
+
+    def append(self, row_data: List):
+        """Append a row; a row without formula output gets 0 until it's calculated"""
+        self.types.append(row_data[0])
+        self.L.append(row_data[1])
+        self.P.append(row_data[2])
+        self.H.append(row_data[3])
+        self.door_models.append(row_data[4])
+        self.color_categories.append(row_data[5])
+        self.color_codes.append(row_data[6])
+        self.outputs.append(row_data[7] if len(row_data) > 7 else 0.0)
+
+    def extend(self, other: 'QuantityTable'):
+        """Append every row of another quantity table, formula outputs included"""
+        self.types.extend(other.types)
+        self.L.extend(other.L)
+        self.P.extend(other.P)
+        self.H.extend(other.H)
+        self.door_models.extend(other.door_models)
+        self.color_categories.extend(other.color_categories)
+        self.color_codes.extend(other.color_codes)
+        self.outputs.extend(other.outputs)
+
+    def __len__(self) -> int:
+        return len(self.L)
+
+    def __getitem__(self, row_idx: int) -> List:
+        return [self.types[row_idx], self.L[row_idx], self.P[row_idx], self.H[row_idx],
+                self.door_models[row_idx], self.color_categories[row_idx], self.color_codes[row_idx],
+                self.outputs[row_idx]]
+
+    def __setitem__(self, row_idx: int, row_data: List):
+        self.types[row_idx] = row_data[0]
+        self.L[row_idx] = row_data[1]
+        self.P[row_idx] = row_data[2]
+        self.H[row_idx] = row_data[3]
+        self.door_models[row_idx] = row_data[4]
+        self.color_categories[row_idx] = row_data[5]
+        self.color_codes[row_idx] = row_data[6]
+        self.outputs[row_idx] = row_data[7]
+
+    def __iter__(self) -> Iterator[List]:
+        for row_idx in range(len(self)):
+            yield self[row_idx]
+
+    def calculate_formulas(self, calculate: Callable[[str, float, float, float], float] = calculate_formula):
+        """Fill in the formula output column for every row.
+
+        Tables of VECTORIZE_THRESHOLD rows or more always use the NumPy path,
+        which gives the same outputs, and ignore calculate: a FormulaMemo
+        passed in is bypassed there. Smaller ones call calculate per row.
+        """
+        if len(self) >= VECTORIZE_THRESHOLD:
+            import numpy as np
+            from vectorized import calculate_formula_codes
+
+            outputs = calculate_formula_codes(self.types.values, np.asarray(self.types.codes),
+                                              self.L, self.P, self.H)
+            self.outputs = array('d', outputs.tobytes())
+        else:
+            types = self.types.values
+            self.outputs = array('d', (calculate(types[code], L, P, H)
+                                       for code, L, P, H in zip(self.types.codes, self.L, self.P, self.H)))
+
+    def aggregate(self, deleted_rows=()) -> Dict[Tuple[str, str, str, str], List]:
+        """Group rows by normalized type, door model, color category and color code.
+
+        Returns [total, row count, min, max] of the formula output for every
+        group, skipping deleted rows. Each distinct type string is normalized
+        once and rows are grouped on their integer codes; large tables are
+        grouped with NumPy.
+        """
+        # Code of the normalized type for every distinct type string
+        normalized_types = StringColumn()
+        type_groups = array('i', [normalized_types.encode(normalize_type(value)) for value in self.types.values])
+
+        if len(self) >= VECTORIZE_THRESHOLD:
+            return self._aggregate_array(normalized_types.values, type_groups, deleted_rows)
+
+        groups = {}
+        rows = zip(self.types.codes, self.door_models.codes, self.color_categories.codes,
+                   self.color_codes.codes, self.outputs)
+        for row_idx, (type_code, model_code, category_code, color_code, output) in enumerate(rows):
+            if deleted_rows and row_idx in deleted_rows:
+                continue
+            key = (type_groups[type_code], model_code, category_code, color_code)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [output, 1, output, output]
+            else:
+                group[0] += output
+                group[1] += 1
+                if output < group[2]:
+                    group[2] = output
+                if output > group[3]:
+                    group[3] = output
+
+        # Decode the group keys back to strings
+        return {(normalized_types.values[key[0]], self.door_models.values[key[1]],
+                 self.color_categories.values[key[2]], self.color_codes.values[key[3]]): group
+                for key, group in groups.items()}
+
+    def _aggregate_array(self, normalized_types: List[str], type_groups: array, deleted_rows) -> Dict[Tuple, List]:
+        """NumPy version of the grouping in aggregate"""
+        import numpy as np
+        from vectorized import aggregate_codes
+
+        key_values = [normalized_types, self.door_models.values, self.color_categories.values,
+                      self.color_codes.values]
+        key_columns = [np.asarray(type_groups)[np.asarray(self.types.codes)], np.asarray(self.door_models.codes),
+                       np.asarray(self.color_categories.codes), np.asarray(self.color_codes.codes)]
+
+        keep = None
+        if deleted_rows:
+            keep = np.ones(len(self), dtype=bool)
+            keep[np.fromiter(deleted_rows, dtype=np.intp, count=len(deleted_rows))] = False
+
+        group_codes, totals, counts, mins, maxs = aggregate_codes(
+            key_columns, [len(values) for values in key_values], np.asarray(self.outputs), keep)
+
+        # Decode a whole key column at a time
+        keys = zip(*[np.array(values, dtype=object)[codes].tolist()
+                     for values, codes in zip(key_values, group_codes)])
+        groups = map(list, zip(totals.tolist(), counts.tolist(), mins.tolist(), maxs.tolist()))
+        return dict(zip(keys, groups))
+
+    def summarize(self, deleted_rows=()) -> Tuple[Dict, Dict, Dict]:
+        """Summary totals, row counts and [min, max] formula outputs of every group, skipping deleted rows"""
+        groups = self.aggregate(deleted_rows)
+        return ({key: group[0] for key, group in groups.items()},
+                {key: group[1] for key, group in groups.items()},
+                {key: group[2:] for key, group in groups.items()})
+
+    def group_rows(self, deleted_rows=()) -> Dict[Tuple[str, str, str, str], List[int]]:
+        """Indices of the rows in every summary group, skipping deleted rows"""
+        normalized_types = [normalize_type(value) for value in self.types.values]
+        groups = {}
+        rows = zip(self.types.codes, self.door_models.codes, self.color_categories.codes, self.color_codes.codes)
+        for row_idx, codes in enumerate(rows):
+            if deleted_rows and row_idx in deleted_rows:
+                continue
+            group = groups.get(codes)
+            if group is None:
+                groups[codes] = [row_idx]
+            else:
+                group.append(row_idx)
+
+        # Types that normalize to the same group share its rows
+        named_groups = {}
+        for (type_code, model_code, category_code, color_code), row_indices in groups.items():
+            key = (normalized_types[type_code], self.door_models.values[model_code],
+                   self.color_categories.values[category_code], self.color_codes.values[color_code])
+            named_groups.setdefault(key, []).extend(row_indices)
+        return named_groups
+
+
+def build_quantity_table(parts_data: Iterable[Tuple[str, ...]],
+                         calculate: Callable[[str, float, float, float], float] = calculate_formula,
+                         timer: StageTimer = None) -> QuantityTable:
+    """Build the columnar quantity table, including the formula output column.
+
+    With timer, reading the parts rows and evaluating the formulas are
+    recorded as the 'parse' and 'formulas' stages.
+    """
+    timer = timer if timer is not None else StageTimer()
+    quantity_table = QuantityTable()
+
+    with timer.stage('parse') as record:
+        for row_data in extract_quantity_rows(parts_data):
+            quantity_table.append(row_data)
+        record['rows'] = len(quantity_table)
+
+    with timer.stage('formulas', len(quantity_table)):
+        quantity_table.calculate_formulas(calculate)
+    return quantity_table
+
+
+def summary_key(row_data: List) -> Tuple[str, str, str, str]:
+    """Summary group of a quantity row: normalized type, door model, color category and color code"""
+    return normalize_type(row_data[0]), row_data[4], row_data[5], row_data[6]
+
+
+def add_to_summary(summary_dict: Dict, row_data: List, summary_counts: Dict = None, summary_stats: Dict = None):
+    """Add one quantity row to the summary aggregates.
+
+    summary_counts, if given, tracks the number of rows in each group so
+    rows can later be taken out again with remove_from_summary.
+    summary_stats, if given, tracks the [min, max] formula output of each
+    group; None marks a group whose min or max row was taken out and must
+    be computed again from its rows.
+    """
+    key = summary_key(row_data)
+    formula_output = row_data[7]
+
+    if key in summary_dict:
+        summary_dict[key] += formula_output
+    else:
+        summary_dict[key] = formula_output
+
+    if summary_counts is not None:
+        summary_counts[key] = summary_counts.get(key, 0) + 1
+
+    if summary_stats is not None:
+        if key not in summary_stats:
+            summary_stats[key] = [formula_output, formula_output]
+        else:
+            stats = summary_stats[key]
+            if stats is not None:
+                if formula_output < stats[0]:
+                    stats[0] = formula_output
+                if formula_output > stats[1]:
+                    stats[1] = formula_output
+
+
+def remove_from_summary(summary_dict: Dict, row_data: List, summary_counts: Dict, summary_stats: Dict = None):
+    """Take one quantity row back out of the summary aggregates (see add_to_summary)"""
+    key = summary_key(row_data)
+
+    summary_counts[key] -= 1
+    if summary_counts[key]:
+        summary_dict[key] -= row_data[7]
+        if summary_stats is not None:
+            stats = summary_stats[key]
+            if stats is not None and row_data[7] in stats:
+                summary_stats[key] = None
+    else:
+        # Drop empty groups rather than leaving a rounding residue behind
+        del summary_counts[key]
+        del summary_dict[key]
+        if summary_stats is not None:
+            del summary_stats[key]
+
+
+def summary_rows(summary_dict: Dict) -> List[List]:
+    """Turn summary aggregates into sorted summary table rows"""
+    return [list(key) + [total] for key, total in sorted(summary_dict.items())]
+
+
+def build_summary_table(quantity_table_data: Iterable[List], deleted_rows=()) -> List[List]:
+    """Group quantity rows by type, door model, color category, and color code"""
+    if isinstance(quantity_table_data, QuantityTable):
+        return summary_rows(quantity_table_data.summarize(deleted_rows)[0])
+
+    summary_dict = {}
+
+    for row_idx, row_data in enumerate(quantity_table_data):
+        # Skip deleted rows
+        if row_idx in deleted_rows:
+            continue
+        add_to_summary(summary_dict, row_data)
+
+    return summary_rows(summary_dict)
+
+
+def summarize_parts_list(filename: str, calculate: Callable[[str, float, float, float], float] = calculate_formula
+                         ) -> Tuple[List[List], int]:
+    """Stream a parts list straight into the summary table in constant memory.
+
+    Returns the summary rows and the number of quantity rows aggregated.
+    """
+    summary_dict = {}
+    row_count = 0
+
+    for row_data in iter_quantity_rows(iter_parts_list(filename), calculate):
+        add_to_summary(summary_dict, row_data)
+        row_count += 1
+
+    return summary_rows(summary_dict), row_count
+
+
+def price_key(door_model: str, color_category: str, color_code: str) -> Tuple[str, str, str]:
+    """Case-insensitive price table key"""
+    return (door_model or '').upper(), (color_category or '').upper(), (color_code or '').upper()
+
+
+def parse_price(value) -> float:
+    """Parse a price table cell, treating blank or invalid prices as 0"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# Price table key fields (door model, color category, color code) a price
+# rule pins, most specific first. A blank field in a price row matches any
+# value. A rule pinning more fields wins; between rules pinning as many,
+# the door model counts most, then the color code (one color) over the
+# color category (a group of colors).
+PRICE_RULE_TIERS = ((0, 1, 2), (0, 2), (0, 1), (1, 2), (0,), (2,), (1,), ())
+
+
+def _no_fields(key: Tuple[str, str, str]) -> Tuple:
+    return ()
+
+
+class PriceIndex(dict):
+    """Parsed price table: prices by price_key, with blank key fields as wildcards.
+
+    Each row is also filed under the tier of the key fields it pins, so
+    match() finds the most specific rule for a key with one dict probe per
+    tier that has rows, instead of scanning the rows.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tiers = {pinned: ((itemgetter(*pinned) if pinned else _no_fields), {})
+                      for pinned in PRICE_RULE_TIERS}
+        # (fields getter, rules) of the tiers that have rows, most specific first
+        self.probes = []
+
+    def add(self, key: Tuple[str, str, str], prices: Dict[str, float]):
+        """Add a price row; when several rows share a key the first one wins"""
+        if key in self:
+            return
+        self[key] = prices
+
+        pinned = tuple(i for i, field in enumerate(key) if field.strip())
+        fields, rules = self.tiers[pinned]
+        if not rules:
+            self.probes = [self.tiers[tier] for tier in PRICE_RULE_TIERS if self.tiers[tier][1] or tier == pinned]
+        rules.setdefault(fields(key), key)
+
+    def match(self, key: Tuple[str, str, str]) -> Optional[Tuple[str, str, str]]:
+        """The key of the most specific price row matching a price_key, or None"""
+        for fields, rules in self.probes:
+            rule = rules.get(fields(key))
+            if rule is not None:
+                return rule
+        return None
+
+
+def price_rule_text(rule: Tuple[str, str, str]) -> str:
+    """Price row key for display, with * for the wildcard fields"""
+    return ' / '.join(field if field.strip() else '*' for field in rule)
+
+
+def load_price_table(price_table_path: str) -> PriceIndex:
+    """Load price table from CSV.
+
+    Returns an index from (door model, color category, color code), upper
+    cased, to the prices of that row parsed to floats. When several rows
+    share a key the first one wins, as it did with the old linear scan.
+    Blank key fields match any value (see PriceIndex).
+    """
+    price_data = PriceIndex()
+
+    try:
+        with open(price_table_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            headers = next(reader, [])
+            # Header positions, mapping duplicate headers the same way csv.DictReader does
+            positions = {header: i for i, header in enumerate(headers)}
+            key_positions = [positions.get(header) for header in PRICE_KEY_HEADERS]
+            price_columns = set(TYPE_TO_PRICE_COLUMN.values())
+            missing_prices = {column: 0.0 for column in price_columns if column not in positions}
+            price_positions = [(column, positions[column]) for column in price_columns if column in positions]
+
+            for row in reader:
+                if not row:
+                    continue
+                # Pad short rows so missing cells read as blank
+                row.extend([''] * (len(headers) - len(row)))
+
+                key = price_key(*(row[i] if i is not None else '' for i in key_positions))
+                if key not in price_data:
+                    prices = {column: parse_price(row[i]) for column, i in price_positions}
+                    prices.update(missing_prices)
+                    price_data.add(key, prices)
+    except Exception as e:
+        print(f"Error loading price table: {e}")
+
+    return price_data
+
+
+# Parsed price tables by absolute path, with the (mtime, size) they were parsed at
+_price_table_cache = {}
+
+
+def get_price_table(price_table_path: str) -> PriceIndex:
+    """Return the parsed price table, parsing the CSV again only if it changed on disk"""
+    path = os.path.abspath(price_table_path)
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _price_table_cache.pop(path, None)
+        return load_price_table(path)
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _price_table_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    price_data = load_price_table(path)
+    _price_table_cache[path] = (signature, price_data)
+    return price_data
+
+
+def invalidate_price_table(price_table_path: str):
+    """Drop the cached price table, e.g. after it was saved"""
+    _price_table_cache.pop(os.path.abspath(price_table_path), None)
+
+
+def get_unit_price(part_type: str, door_model: str, color_category: str,
+                   color_code: str, price_data: PriceIndex) -> float:
+    """Get unit price from price table"""
+    return match_unit_price(part_type, door_model, color_category, color_code, price_data)[0]
+
+
+def match_unit_price(part_type: str, door_model: str, color_category: str,
+                     color_code: str, price_data: PriceIndex) -> Tuple[float, Optional[Tuple[str, str, str]]]:
+    """Unit price of a summary row and the key of the price row it came from (None if no row matched)"""
+    price_column = TYPE_TO_PRICE_COLUMN.get(part_type, '')
+
+    if not price_column:
+        return 0.0, None
+
+    rule = price_data.match(price_key(door_model, color_category, color_code))
+    if rule is None:
+        return 0.0, None
+
+    return price_data[rule][price_column], rule
+
+
+def build_cost_table(summary_table_data: List[List], price_data: PriceIndex) -> Tuple[List[List], float]:
+    """Add unit price, total price and the matched price rule to the summary rows"""
+    cost_table_data = []
+    total_cost = 0
+
+    for row_data in summary_table_data:
+        part_type, door_model, color_category, color_code, formula_output = row_data[:5]
+
+        unit_price, rule = match_unit_price(part_type, door_model, color_category, color_code, price_data)
+
+        total_price = formula_output * unit_price
+        total_cost += total_price
+
+        cost_table_data.append(list(row_data) + [unit_price, total_price,
+                                                 price_rule_text(rule) if rule is not None else ''])
+
+    return cost_table_data, total_cost
+
+
+def write_cost_table(filename: str, cost_table_data: List[List]):
+    """Write a cost table to CSV, followed by a total row"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+
+        # Write headers
+        writer.writerow(COST_HEADERS)
+
+        # Write data
+        for row in cost_table_data:
+            writer.writerow(row)
+
+        # Write total
+        total = sum(row[6] for row in cost_table_data)
+        writer.writerow(["", "", "", "", "", "TOTAL", total])
+
+
+class PricingEngine:
+    """Headless parse -> quantity -> summary -> cost pipeline.
+
+    The price table is parsed once and reused for every file priced by the
+    engine, until the CSV changes on disk. An optional formula memo (see
+    formula_memo.FormulaMemo) is used for row-by-row formula evaluation:
+    streamed files and quantity tables below VECTORIZE_THRESHOLD rows.
+    """
+
+    def __init__(self, price_table_path: str = "price_table.csv", memo=None):
+        self.price_table_path = price_table_path
+        self.memo = memo
+        self.calculate = memo.calculate if memo is not None else calculate_formula
+
+    @property
+    def price_data(self) -> PriceIndex:
+        return get_price_table(self.price_table_path)
+
+    def price_file(self, filename: str, streaming: bool = False, cache: bool = False,
+                   timer: StageTimer = None, parse_workers: int = 1) -> Dict:
+        """Price a single parts list file.
+
+        In streaming mode the quantity table is not kept, and the file is
+        aggregated into the summary table row by row. With cache, the
+        quantity table is read from (or written to) the binary cache next
+        to the file. With parse_workers > 1, a large file is split into byte
+        ranges parsed by that many processes; otherwise a large file is
+        read with pandas' C parser. The time, rows and peak memory
+        of each stage are returned under 'stages'.
+        """
+        timer = timer if timer is not None else StageTimer()
+
+        if streaming:
+            quantity_table_data = None
+            with timer.stage('summary (streamed)') as record:
+                summary_table_data, row_count = summarize_parts_list(filename, self.calculate)
+                record['rows'] = row_count
+        else:
+            if cache:
+                from parts_cache import load_quantity_table
+                quantity_table_data = load_quantity_table(filename, calculate=self.calculate, timer=timer,
+                                                          workers=parse_workers)
+            else:
+                from parallel_parse import build_quantity_table_from_file
+                quantity_table_data = build_quantity_table_from_file(filename, calculate=self.calculate, timer=timer,
+                                                                     workers=parse_workers)
+            row_count = len(quantity_table_data)
+            with timer.stage('summary', row_count):
+                summary_table_data = build_summary_table(quantity_table_data)
+
+        return self.price_summary(filename, row_count, quantity_table_data, summary_table_data, timer)
+
+    def price_summary(self, filename: str, row_count: int, quantity_table_data, summary_table_data: List[List],
+                      timer: StageTimer) -> Dict:
+        """Add the cost table to a priced file's result"""
+        with timer.stage('prices') as record:
+            price_data = self.price_data
+            record['rows'] = len(price_data)
+        with timer.stage('cost', len(summary_table_data)):
+            cost_table_data, total_cost = build_cost_table(summary_table_data, price_data)
+
+        return {
+            'filename': filename,
+            'parts': row_count,
+            'quantity_table': quantity_table_data,
+            'summary_table': summary_table_data,
+            'cost_table': cost_table_data,
+            'total_cost': total_cost,
+            'stages': timer.stages
+        }
+
+    def price_text(self, text: str, timer: StageTimer = None) -> Dict:
+        """Price parts list text that is already in memory, e.g. a request body"""
+        timer = timer if timer is not None else StageTimer()
+        # newline=None splits lines the way reading a file in text mode does;
+        # str.splitlines also breaks on form feeds and other separators
+        lines = io.StringIO(text, newline=None)
+        quantity_table_data = build_quantity_table(iter_parts_lines(lines), self.calculate, timer)
+        with timer.stage('summary', len(quantity_table_data)):
+            summary_table_data = build_summary_table(quantity_table_data)
+
+        return self.price_summary('', len(quantity_table_data), quantity_table_data, summary_table_data, timer)
@@ -0,0 +1,74 @@
+import json
+import os
+from collections import OrderedDict
+
+from engine import FORMULA_VERSION, resolve_formula
+
+# Version of the saved memo's keys; memos saved with other keys are ignored
+MEMO_FORMAT = 2
+
+
+class FormulaMemo:
+    """Bounded LRU memo of formula outputs.
+
+    Entries are keyed on the type string as given plus L, P and H, so a hit
+    doesn't resolve the type. Real kitchens repeat the same cabinets, so
+    similar projects mostly hit the memo. The memo can be saved to disk and
+    loaded by later runs; a saved memo from another FORMULA_VERSION is
+    ignored.
+
+    Only row-by-row evaluation uses the memo; quantity tables large enough
+    for the NumPy path bypass it (see QuantityTable.calculate_formulas).
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def calculate(self, part_type: str, L: float, P: float, H: float) -> float:
+        """Calculate the formula output based on part type, reusing earlier results"""
+        key = (part_type, L, P, H)
+
+        formula_output = self.entries.get(key)
+        if formula_output is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return formula_output
+
+        self.misses += 1
+        # Convert mm to meters
+        formula_output = resolve_formula(part_type)(L / 1000, P / 1000, H / 1000)
+        self.entries[key] = formula_output
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return formula_output
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def load(self, path: str):
+        """Add the entries of a saved memo, unless it was saved for other formulas"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                print(f"Error loading formula memo: {e}")
+            return
+
+        if saved.get('formula_version') != FORMULA_VERSION or saved.get('format') != MEMO_FORMAT:
+            return
+
+        for part_type, L, P, H, formula_output in saved.get('entries', [])[-self.maxsize:]:
+            self.entries[(part_type, L, P, H)] = formula_output
+
+    def save(self, path: str):
+        """Save the memo entries, least recently used first"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': MEMO_FORMAT, 'formula_version': FORMULA_VERSION,
+                       'entries': [list(key) + [value] for key, value in self.entries.items()]}, f)
+        os.replace(temp_path, path)
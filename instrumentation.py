@@ -0,0 +1,157 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+# cProfile, tracemalloc, json and datetime are imported where they are used,
+# so timing every run doesn't slow down startup
+
+
+def tracing_memory() -> bool:
+    """Whether tracemalloc is tracing; it is only ever started by RunProfiler"""
+    tracemalloc = sys.modules.get('tracemalloc')
+    return tracemalloc is not None and tracemalloc.is_tracing()
+
+
+def peak_memory() -> int:
+    """Peak memory of the process so far, in bytes (0 where it can't be read).
+
+    While tracemalloc is tracing (see RunProfiler), the traced Python peak
+    is used instead, which StageTimer resets at the start of every stage.
+    """
+    if tracing_memory():
+        return sys.modules['tracemalloc'].get_traced_memory()[1]
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        try:
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return counters.PeakWorkingSetSize
+        except (AttributeError, OSError):
+            pass
+        return 0
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageTimer:
+    """Wall time, row count and peak memory of each pipeline stage.
+
+    Stages are recorded in the order they start. Recording a stage costs a
+    few microseconds, so pipelines always time themselves and callers
+    decide whether to show or log the result.
+    """
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[Dict]:
+        """Time the enclosed block; the yielded record's 'rows' can be set inside it"""
+        record = {'stage': name, 'seconds': 0.0, 'rows': rows, 'peak_memory': 0}
+        self.stages.append(record)
+        if tracing_memory():
+            sys.modules['tracemalloc'].reset_peak()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            record['peak_memory'] = peak_memory()
+
+    def add(self, name: str, seconds: float, rows: int = 0):
+        """Record a stage that was timed elsewhere, e.g. across several UI ticks"""
+        self.stages.append({'stage': name, 'seconds': seconds, 'rows': rows, 'peak_memory': peak_memory()})
+
+    def total(self) -> float:
+        return sum(record['seconds'] for record in self.stages)
+
+    def status_text(self) -> str:
+        """One-line summary of the stages for a status bar"""
+        parts = []
+        for record in self.stages:
+            text = f"{record['stage']} {record['seconds']:.2f}s"
+            if record['rows']:
+                text += f" ({record['rows']:,} rows)"
+            parts.append(text)
+        peak = max((record['peak_memory'] for record in self.stages), default=0)
+        if peak:
+            parts.append(f"peak {peak / (1024 * 1024):,.1f} MB")
+        return ', '.join(parts)
+
+    def write_log(self, path: str, **context):
+        """Append the stages as one JSON line, with context such as the file name"""
+        import json
+        from datetime import datetime
+
+        entry = {'time': datetime.now().isoformat(timespec='seconds')}
+        entry.update(context)
+        entry['stages'] = self.stages
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def write_stage_log(path: str, stages: List[Dict], **context):
+    """Append stages recorded by another StageTimer (e.g. in a worker process) to a log"""
+    timer = StageTimer()
+    timer.stages = stages
+    timer.write_log(path, **context)
+
+
+class RunProfiler:
+    """Opt-in cProfile and tracemalloc capture.
+
+    Writes the cProfile stats to path (readable with pstats or snakeviz)
+    and the top memory allocation sites to path + '.memory.txt'. cProfile
+    only sees the thread that started it.
+    """
+
+    def __init__(self, path: str, top: int = 50):
+        self.path = path
+        self.top = top
+        self.profile = None
+
+    def start(self):
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self):
+        import tracemalloc
+
+        self.profile.disable()
+        self.profile.dump_stats(self.path)
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(self.path + '.memory.txt', 'w', encoding='utf-8') as f:
+            f.write(f"Traced memory: current {current:,} bytes, peak {peak:,} bytes\n\n")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                f.write(f"{stat}\n")
+
+    def __enter__(self) -> 'RunProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,116 @@
+import io
+import os
+from typing import Callable, List, Tuple
+
+from bulk_parse import BULK_MIN_BYTES, load_quantity_table_bulk, read_bulk
+from engine import QuantityTable, build_quantity_table, calculate_formula, iter_parts_lines, iter_parts_list
+from instrumentation import StageTimer
+
+# Largest byte range handed to one worker task; a multi-GB file is split
+# into many ranges so workers stay busy and each result stays small
+MAX_RANGE_BYTES = 64 * 1024 * 1024
+
+# Files smaller than this are parsed in-process; the pool isn't worth it
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+
+def split_byte_ranges(filename: str, count: int, max_bytes: int = MAX_RANGE_BYTES) -> List[Tuple[int, int]]:
+    """Split a file into at least count (start, end) byte ranges that each end after a newline"""
+    size = os.path.getsize(filename)
+    count = max(count, -(-size // max_bytes), 1)
+    step = max(size // count, 1)
+
+    ranges = []
+    start = 0
+    with open(filename, 'rb') as f:
+        while start < size:
+            end = start + step
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_byte_range(filename: str, start: int, end: int,
+                     calculate: Callable[[str, float, float, float], float] = calculate_formula) -> QuantityTable:
+    """Parse, ADIN-filter and evaluate the formulas of one newline-aligned byte range"""
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    if len(data) >= BULK_MIN_BYTES:
+        quantity_table = read_bulk(io.BytesIO(data), calculate)
+        if quantity_table is not None:
+            return quantity_table
+
+    # newline=None gives the same universal newline handling as reading the file in text mode
+    lines = io.StringIO(data.decode('utf-8'), newline=None)
+    return build_quantity_table(iter_parts_lines(lines), calculate)
+
+
+def load_quantity_table_parallel(filename: str, workers: int = None,
+                                 calculate: Callable[[str, float, float, float], float] = calculate_formula,
+                                 progress: Callable[[int, int], None] = None) -> QuantityTable:
+    """Build the quantity table of one large parts list with a process pool.
+
+    The file is split into newline-aligned byte ranges that workers parse
+    and evaluate on their own. The range tables are joined back in file
+    order, so the quantity table, and every summary built from it, is
+    identical to parsing the file on one core.
+
+    progress, if given, is called as ranges finish with the number of bytes
+    and rows done so far.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    ranges = split_byte_ranges(filename, workers)
+
+    quantity_table = QuantityTable()
+    bytes_done = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)) or 1) as executor:
+        futures = [executor.submit(parse_byte_range, filename, start, end, calculate) for start, end in ranges]
+        try:
+            # Joined in file order, as each range completes
+            for (start, end), future in zip(ranges, futures):
+                quantity_table.extend(future.result())
+                bytes_done += end - start
+                if progress is not None:
+                    progress(bytes_done, len(quantity_table))
+        except BaseException:
+            # Don't start the remaining ranges after an error or a cancelled load
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return quantity_table
+
+
+def build_quantity_table_from_file(filename: str, progress: Callable[[int, int], None] = None,
+                                   calculate: Callable[[str, float, float, float], float] = calculate_formula,
+                                   timer: StageTimer = None, workers: int = 1) -> QuantityTable:
+    """Parse a parts list into its quantity table.
+
+    Large files are split across worker processes when workers > 1, and
+    otherwise read with pandas' C parser (see bulk_parse); both give the
+    same table as the line by line parser used for small files.
+    """
+    timer = timer if timer is not None else StageTimer()
+    size = os.path.getsize(filename)
+
+    if workers > 1 and size >= PARALLEL_MIN_BYTES:
+        with timer.stage(f'parse + formulas ({workers} workers)') as record:
+            quantity_table = load_quantity_table_parallel(filename, workers, calculate, progress)
+            record['rows'] = len(quantity_table)
+        return quantity_table
+
+    if size >= BULK_MIN_BYTES:
+        quantity_table = load_quantity_table_bulk(filename, calculate, progress, timer)
+        if quantity_table is not None:
+            return quantity_table
+
+    return build_quantity_table(iter_parts_list(filename, progress), calculate, timer)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, Dict, Optional
+
+from engine import FORMULA_VERSION, QuantityTable, StringColumn, calculate_formula
+from instrumentation import StageTimer
+from parallel_parse import build_quantity_table_from_file
+
+# Binary cache of a parsed parts list, written next to it as <file>.qtcache:
+#
+#   MAGIC, header length (8 bytes, little endian), JSON header, padding to 8 bytes,
+#   then the columns back to back: L, P, H and formula output as doubles, and
+#   type, door model, color category and color code as int codes.
+#
+# The header holds the source file's content hash, the formula version and the
+# distinct strings of each dictionary-encoded column.
+MAGIC = b'PLQCACHE'
+CACHE_FORMAT = 1
+CACHE_SUFFIX = '.qtcache'
+
+FLOAT_COLUMNS = ('L', 'P', 'H', 'outputs')
+STRING_COLUMNS = ('types', 'door_models', 'color_categories', 'color_codes')
+
+
+def cache_path(filename: str) -> str:
+    """Path of the binary cache of a parts list"""
+    return filename + CACHE_SUFFIX
+
+
+def file_hash(filename: str) -> str:
+    """Content hash of a file"""
+    digest = hashlib.blake2b()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_cache(filename: str, quantity_table: QuantityTable, source_hash: str, stat: os.stat_result):
+    """Write the quantity table of a parts list to its binary cache.
+
+    stat and source_hash must be taken before the file is parsed, so a file
+    rewritten during the parse doesn't get a cache stamped with its new
+    size and mtime.
+    """
+    header = {
+        'format': CACHE_FORMAT,
+        'formula_version': FORMULA_VERSION,
+        'byteorder': sys.byteorder,
+        'source_hash': source_hash,
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'rows': len(quantity_table),
+        'strings': {name: getattr(quantity_table, name).values for name in STRING_COLUMNS}
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    padding = -(len(MAGIC) + 8 + len(header_bytes)) % 8
+
+    # Write to a temporary file first so a half-written cache is never read
+    path = cache_path(filename)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * padding)
+        for name in FLOAT_COLUMNS:
+            getattr(quantity_table, name).tofile(f)
+        for name in STRING_COLUMNS:
+            getattr(quantity_table, name).codes.tofile(f)
+    os.replace(temp_path, path)
+
+
+def read_cache(filename: str) -> Optional[QuantityTable]:
+    """Read the cached quantity table of a parts list, or None if it's missing or stale"""
+    path = cache_path(filename)
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                return None
+            header_length = struct.unpack_from('<Q', mm, len(MAGIC))[0]
+            offset = len(MAGIC) + 8
+            header = json.loads(mm[offset:offset + header_length].decode('utf-8'))
+
+            if (header['format'] != CACHE_FORMAT or header['formula_version'] != FORMULA_VERSION or
+                    header['byteorder'] != sys.byteorder or not source_matches(filename, header)):
+                return None
+
+            offset += header_length
+            offset += -offset % 8
+            rows = header['rows']
+            # A truncated or padded cache would give columns of different lengths
+            if len(mm) != offset + rows * (8 * len(FLOAT_COLUMNS) + 4 * len(STRING_COLUMNS)):
+                return None
+
+            quantity_table = QuantityTable()
+            view = memoryview(mm)
+            try:
+                for name, typecode in [(name, 'd') for name in FLOAT_COLUMNS] + [(name, 'i') for name in STRING_COLUMNS]:
+                    column = array(typecode)
+                    size = rows * column.itemsize
+                    column.frombytes(view[offset:offset + size])
+                    offset += size
+                    if name in FLOAT_COLUMNS:
+                        setattr(quantity_table, name, column)
+                    else:
+                        setattr(quantity_table, name, StringColumn.from_codes(header['strings'][name], column))
+            finally:
+                view.release()
+
+            return quantity_table
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+def source_matches(filename: str, header: Dict) -> bool:
+    """Whether the parts list still has the content the cache was built from"""
+    stat = os.stat(filename)
+    if stat.st_size != header['source_size']:
+        return False
+    # An unchanged size and mtime is trusted without reading the whole file
+    if stat.st_mtime_ns == header['source_mtime_ns']:
+        return True
+    return file_hash(filename) == header['source_hash']
+
+
+def load_quantity_table(filename: str, progress: Callable[[int, int], None] = None,
+                        calculate: Callable[[str, float, float, float], float] = calculate_formula,
+                        timer: StageTimer = None, workers: int = 1) -> QuantityTable:
+    """Load the quantity table of a parts list, from its binary cache when it's fresh.
+
+    Otherwise the text is parsed and a new cache is written next to it.
+    Failing to write the cache (e.g. a read-only folder) isn't an error.
+    With workers > 1, large files are parsed in that many processes.
+    """
+    timer = timer if timer is not None else StageTimer()
+
+    with timer.stage('cache read') as record:
+        quantity_table = read_cache(filename)
+        record['rows'] = len(quantity_table) if quantity_table is not None else 0
+    if quantity_table is not None:
+        return quantity_table
+
+    stat = os.stat(filename)
+    source_hash = file_hash(filename)
+    quantity_table = build_quantity_table_from_file(filename, progress, calculate, timer, workers)
+
+    with timer.stage('cache write', len(quantity_table)):
+        try:
+            write_cache(filename, quantity_table, source_hash, stat)
+        except OSError as e:
+            print(f"Error writing parts list cache: {e}")
+
+    return quantity_table
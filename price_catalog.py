@@ -0,0 +1,172 @@
+import csv
+import os
+from typing import Dict, List, Optional, Tuple
+
+from engine import PRICE_KEY_HEADERS, PRICE_TABLE_HEADERS, price_key
+
+
+class PriceCatalog:
+    """Price table rows for editing, kept exactly as the CSV strings read.
+
+    search() filters on door model, color category and color code through
+    an index of their distinct values, so a catalog of tens of thousands of
+    rows is searched by testing a few hundred strings. save() writes the
+    file atomically, and only when a row was added, changed or deleted.
+    """
+
+    def __init__(self, headers: List[str] = None, rows: List[List[str]] = None):
+        self.headers = list(headers) if headers else list(PRICE_TABLE_HEADERS)
+        self.rows = rows if rows is not None else []
+        self.modified = False
+        # Per key column: upper cased value -> indices of the rows that have it
+        self._index = None
+
+    @classmethod
+    def load(cls, path: str) -> 'PriceCatalog':
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            headers = next(reader, [])
+            rows = []
+            for row in reader:
+                if not row:
+                    continue
+                # Pad short rows so every row has a cell per column
+                row.extend([''] * (len(headers) - len(row)))
+                rows.append(row)
+        return cls(headers, rows)
+
+    def key_positions(self, headers: List[str] = None) -> List[Optional[int]]:
+        """Positions of the door model, color category and color code columns (None if missing)"""
+        headers = headers if headers is not None else self.headers
+        return [headers.index(header) if header in headers else None for header in PRICE_KEY_HEADERS]
+
+    def row_key(self, row: List[str], positions: List[Optional[int]] = None) -> Tuple[str, str, str]:
+        """The price_key of a row"""
+        positions = positions if positions is not None else self.key_positions()
+        return price_key(*(row[i] if i is not None else '' for i in positions))
+
+    def changed(self):
+        """Record that rows were added, changed or deleted"""
+        self.modified = True
+        self._index = None
+
+    def search(self, text: str) -> List[int]:
+        """Indices of the rows whose door model, color category or color code contain every word of text.
+
+        Case-insensitive; an empty text matches every row.
+        """
+        terms = text.upper().split()
+        if not terms:
+            return list(range(len(self.rows)))
+
+        if self._index is None:
+            self._index = []
+            for position in self.key_positions():
+                values = {}
+                if position is not None:
+                    for row_idx, row in enumerate(self.rows):
+                        values.setdefault(row[position].upper(), []).append(row_idx)
+                self._index.append(values)
+
+        matches = None
+        for term in terms:
+            term_rows = set()
+            for values in self._index:
+                for value, row_indices in values.items():
+                    if term in value:
+                        term_rows.update(row_indices)
+            matches = term_rows if matches is None else matches & term_rows
+        return sorted(matches)
+
+    def add_row(self, values: List[str]):
+        self.rows.append(list(values) + [''] * (len(self.headers) - len(values)))
+        self.changed()
+
+    def delete_rows(self, row_indices: List[int]):
+        for row_idx in sorted(set(row_indices), reverse=True):
+            del self.rows[row_idx]
+        if row_indices:
+            self.changed()
+
+    def apply_patch(self, filename: str) -> Dict:
+        """Merge a patch CSV into the catalog.
+
+        Patch rows are matched to catalog rows by door model, color category
+        and color code (case-insensitive, the first row when several share a
+        key, like pricing does). A matched row takes the patch's non-blank
+        cells; blank cells leave the value as it is. Rows with a new key are
+        added. Columns the catalog doesn't have are ignored.
+
+        The whole patch is read before any row is touched, so a patch that
+        fails to read leaves the catalog as it was.
+
+        Returns the number of rows 'updated' and 'added' and the 'ignored'
+        column names.
+        """
+        with open(filename, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            patch_headers = next(reader, [])
+            patch_key_positions = self.key_positions(patch_headers)
+            missing = [header for header, i in zip(PRICE_KEY_HEADERS, patch_key_positions) if i is None]
+            if missing:
+                raise ValueError(f"Patch has no {', '.join(missing)} column")
+            patch_rows = [patch_row for patch_row in reader if patch_row]
+
+        key_positions = self.key_positions()
+        value_positions = [(patch_headers.index(header), position)
+                           for position, header in enumerate(self.headers)
+                           if header in patch_headers and position not in key_positions]
+
+        first_rows = {}
+        for row_idx, row in enumerate(self.rows):
+            first_rows.setdefault(self.row_key(row, key_positions), row_idx)
+
+        existing = len(self.rows)
+        updated = set()
+        added = 0
+        for patch_row in patch_rows:
+            patch_row.extend([''] * (len(patch_headers) - len(patch_row)))
+            key = self.row_key(patch_row, patch_key_positions)
+
+            row_idx = first_rows.get(key)
+            if row_idx is None:
+                row = [''] * len(self.headers)
+                for patch_position, position in zip(patch_key_positions, key_positions):
+                    if position is not None:
+                        row[position] = patch_row[patch_position]
+                for patch_position, position in value_positions:
+                    row[position] = patch_row[patch_position]
+                first_rows[key] = len(self.rows)
+                self.rows.append(row)
+                added += 1
+                continue
+
+            row = self.rows[row_idx]
+            row_changed = False
+            for patch_position, position in value_positions:
+                value = patch_row[patch_position]
+                if value.strip() and row[position] != value:
+                    row[position] = value
+                    row_changed = True
+            if row_changed and row_idx < existing:
+                updated.add(row_idx)
+
+        if updated or added:
+            self.changed()
+        return {'updated': len(updated), 'added': added,
+                'ignored': [header for header in patch_headers if header not in self.headers]}
+
+    def save(self, path: str) -> bool:
+        """Write the catalog if it changed since it was loaded or last saved; returns whether it was written"""
+        if not self.modified:
+            return False
+
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.headers)
+            writer.writerows(self.rows)
+        os.replace(temp_path, path)
+
+        self.modified = False
+        return True
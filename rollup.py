@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from engine import FORMULA_VERSION, PricingEngine, build_cost_table, summary_rows, write_cost_table
+
+# Version of the saved rollup state; a state saved by another version or for
+# other formulas is ignored and every parts list is summarized again
+ROLLUP_FORMAT = 1
+
+
+def merge_groups(groups: Dict[Tuple, List], other: Dict[Tuple, List]):
+    """Merge one set of [total, row count, min, max] group aggregates into another"""
+    for key, (total, count, low, high) in other.items():
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [total, count, low, high]
+        else:
+            group[0] += total
+            group[1] += count
+            if low < group[2]:
+                group[2] = low
+            if high > group[3]:
+                group[3] = high
+
+
+def file_stamp(filename: str) -> Tuple[int, int]:
+    """Modification time and size of a file, to tell when it changed"""
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CostRollup:
+    """Consolidated summary of many parts lists.
+
+    Every parts list keeps its own group aggregates (QuantityTable.aggregate),
+    and the consolidated groups are merged from them. Adding, replacing or
+    removing one list only re-merges the groups that list touches, so the
+    other lists are never summarized again.
+    """
+
+    def __init__(self):
+        self.parts_lists = {}  # filename -> {'stamp', 'parts', 'groups'}
+        self.groups = {}  # Consolidated group aggregates
+
+    def __len__(self) -> int:
+        return len(self.parts_lists)
+
+    def set_parts_list(self, filename: str, groups: Dict[Tuple, List], parts: int = 0,
+                       stamp: Optional[Tuple[int, int]] = None):
+        """Add a parts list's group aggregates, replacing any earlier ones for the same file"""
+        previous = self.parts_lists.get(filename)
+        self.parts_lists[filename] = {'stamp': stamp, 'parts': parts, 'groups': groups}
+        touched = set(groups)
+        if previous is not None:
+            touched.update(previous['groups'])
+        self.remerge(touched)
+
+    def remove_parts_list(self, filename: str):
+        previous = self.parts_lists.pop(filename, None)
+        if previous is not None:
+            self.remerge(previous['groups'])
+
+    def remerge(self, keys: Iterable[Tuple]):
+        """Merge the consolidated aggregates of some groups again from every parts list"""
+        # Always merge in filename order, so the totals don't depend on the order lists were added
+        parts_lists = [self.parts_lists[filename] for filename in sorted(self.parts_lists)]
+        for key in keys:
+            self.groups.pop(key, None)
+            merged = {}
+            for parts_list in parts_lists:
+                group = parts_list['groups'].get(key)
+                if group is not None:
+                    merge_groups(merged, {key: group})
+            self.groups.update(merged)
+
+    def is_current(self, filename: str) -> bool:
+        """Whether the aggregates of a parts list are up to date with the file on disk"""
+        parts_list = self.parts_lists.get(filename)
+        if parts_list is None or parts_list['stamp'] is None:
+            return False
+        try:
+            return tuple(parts_list['stamp']) == file_stamp(filename)
+        except OSError:
+            return False
+
+    def parts(self) -> int:
+        return sum(parts_list['parts'] for parts_list in self.parts_lists.values())
+
+    def summary_table(self) -> List[List]:
+        return summary_rows({key: group[0] for key, group in self.groups.items()})
+
+    def cost_table(self, price_data: Dict) -> Tuple[List[List], float]:
+        """Consolidated cost table rows and total cost"""
+        return build_cost_table(self.summary_table(), price_data)
+
+    def save(self, path: str):
+        """Save every parts list's aggregates so later runs only summarize changed lists"""
+        state = {
+            'format': ROLLUP_FORMAT,
+            'formula_version': FORMULA_VERSION,
+            'parts_lists': [
+                {'filename': filename, 'stamp': parts_list['stamp'], 'parts': parts_list['parts'],
+                 'groups': [list(key) + group for key, group in parts_list['groups'].items()]}
+                for filename, parts_list in self.parts_lists.items()
+            ]
+        }
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CostRollup':
+        """Load a saved rollup, or an empty one if it is missing or out of date"""
+        rollup = cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                print(f"Error loading rollup state: {e}")
+            return rollup
+
+        if state.get('format') != ROLLUP_FORMAT or state.get('formula_version') != FORMULA_VERSION:
+            return rollup
+
+        for parts_list in state.get('parts_lists', []):
+            stamp = tuple(parts_list['stamp']) if parts_list['stamp'] else None
+            rollup.parts_lists[parts_list['filename']] = {
+                'stamp': stamp, 'parts': parts_list['parts'],
+                'groups': {tuple(row[:4]): row[4:] for row in parts_list['groups']}
+            }
+        rollup.remerge({key for parts_list in rollup.parts_lists.values() for key in parts_list['groups']})
+        return rollup
+
+
+def aggregate_parts_list(engine: PricingEngine, filename: str, cache: bool = False) -> Dict:
+    """Group aggregates of one parts list, with errors returned instead of raised"""
+    try:
+        stamp = file_stamp(filename)
+        if cache:
+            from parts_cache import load_quantity_table
+            quantity_table_data = load_quantity_table(filename, calculate=engine.calculate)
+        else:
+            from parallel_parse import build_quantity_table_from_file
+            quantity_table_data = build_quantity_table_from_file(filename, calculate=engine.calculate)
+        return {'filename': filename, 'stamp': stamp, 'parts': len(quantity_table_data),
+                'groups': quantity_table_data.aggregate(), 'error': ''}
+    except Exception as e:
+        return {'filename': filename, 'stamp': None, 'parts': 0, 'groups': {}, 'error': str(e)}
+
+
+def worker_aggregate_parts_list(filename: str, cache: bool = False) -> Dict:
+    import batch
+    return aggregate_parts_list(batch._worker_engine, filename, cache)
+
+
+def update_rollup(rollup: CostRollup, filenames: List[str], price_table_path: str = "price_table.csv",
+                  workers: int = 1, cache: bool = False) -> List[Dict]:
+    """Bring a rollup up to date with a set of parts lists.
+
+    Lists no longer given are removed, and only new or changed lists are
+    summarized. Returns the results of the lists that were summarized.
+    """
+    wanted = set(filenames)
+    for filename in list(rollup.parts_lists):
+        if filename not in wanted:
+            rollup.remove_parts_list(filename)
+
+    changed = [filename for filename in filenames if not rollup.is_current(filename)]
+    workers = max(1, min(workers, len(changed)))
+
+    if workers == 1:
+        engine = PricingEngine(price_table_path)
+        results = [aggregate_parts_list(engine, filename, cache) for filename in changed]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from batch import init_worker
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(price_table_path,)) as executor:
+            results = list(executor.map(worker_aggregate_parts_list, changed, [cache] * len(changed)))
+
+    for result in results:
+        if result['error']:
+            rollup.remove_parts_list(result['filename'])
+        else:
+            rollup.set_parts_list(result['filename'], result['groups'], result['parts'], result['stamp'])
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    from batch import collect_parts_lists
+
+    parser = argparse.ArgumentParser(description="Consolidated cost table of many parts lists")
+    parser.add_argument('inputs', nargs='+', help="Parts list files, directories or glob patterns")
+    parser.add_argument('--output', required=True, help="Consolidated cost table CSV")
+    parser.add_argument('--state', help="Saved per-list aggregates, so only changed lists are summarized again")
+    parser.add_argument('--price-table', default="price_table.csv", help="Price table CSV")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU core)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Read and write the binary parsed-table cache next to each input")
+    args = parser.parse_args(argv)
+
+    filenames = collect_parts_lists(args.inputs)
+    if not filenames:
+        print("No parts list files found", file=sys.stderr)
+        return 1
+
+    engine = PricingEngine(args.price_table)
+    if not engine.price_data:
+        print(f"Price table not found or empty: {args.price_table}", file=sys.stderr)
+        return 1
+
+    rollup = CostRollup.load(args.state) if args.state else CostRollup()
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+    results = update_rollup(rollup, filenames, args.price_table, workers, args.cache)
+
+    for result in results:
+        if result['error']:
+            print(f"{result['filename']}: ERROR {result['error']}", file=sys.stderr)
+        else:
+            print(f"{result['filename']}: {result['parts']} ADIN parts summarized")
+
+    cost_table_data, total_cost = rollup.cost_table(engine.price_data)
+    write_cost_table(args.output, cost_table_data)
+    if args.state:
+        rollup.save(args.state)
+
+    failed = sum(1 for r in results if r['error'])
+    print(f"ROLLUP TOTAL: {total_cost:.2f} ({len(rollup)} parts lists, {rollup.parts()} ADIN parts, "
+          f"{len(results) - failed} summarized, {failed} failed) -> {args.output}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import argparse
+import csv
+import math
+import os
+import sys
+from typing import Dict, List, Tuple
+
+from engine import SUMMARY_HEADERS, TYPE_TO_PRICE_COLUMN, PriceIndex, PricingEngine, get_price_table, price_key
+
+# NumPy is imported where it is used, so the CLI starts without it
+
+COMPARISON_HEADERS = ["Scenario", "Price Table", "Total Price", "Delta", "Delta %", "Unpriced Rows"]
+
+
+def scenario_name(price_table_path: str) -> str:
+    return os.path.splitext(os.path.basename(price_table_path))[0]
+
+
+def unit_price_matrix(summary_table_data: List[List], price_tables: List[PriceIndex]):
+    """Unit prices of every summary row under every price table, as a (rows x scenarios) array.
+
+    Each distinct price key is matched once per price table and each
+    distinct (key, price column) read once, however many summary rows
+    share them. Rows that no price row matches are NaN, so they can be
+    told apart from a price of 0; rows whose type has no price column are 0,
+    as in the cost table.
+    """
+    import numpy as np
+
+    key_codes = {}
+    lookup_codes = {}
+    row_lookups = []
+    for row_data in summary_table_data:
+        price_column = TYPE_TO_PRICE_COLUMN.get(row_data[0], '')
+        if not price_column:
+            row_lookups.append(-1)
+            continue
+        key_code = key_codes.setdefault(price_key(*row_data[1:4]), len(key_codes))
+        row_lookups.append(lookup_codes.setdefault((key_code, price_column), len(lookup_codes)))
+
+    keys = list(key_codes)
+    lookup_keys = [key_code for key_code, _ in lookup_codes]
+    lookup_columns = [price_column for _, price_column in lookup_codes]
+    lookup_prices = np.empty((len(lookup_codes) + 1, len(price_tables)))
+    # The last lookup is the rows without a price column
+    lookup_prices[-1] = 0.0
+    for scenario_idx, price_data in enumerate(price_tables):
+        matched = [price_data.get(price_data.match(key)) for key in keys]
+        lookup_prices[:-1, scenario_idx] = [math.nan if matched[key_code] is None else matched[key_code][price_column]
+                                            for key_code, price_column in zip(lookup_keys, lookup_columns)]
+
+    return lookup_prices[np.array(row_lookups, dtype=np.intp)]
+
+
+def price_scenarios(summary_table_data: List[List], price_tables: List[PriceIndex]) -> Dict:
+    """Price one summary table under many price tables in one vectorized pass.
+
+    Returns the (rows x scenarios) 'unit_prices' (NaN where unpriced) and
+    'total_prices' matrices, each scenario's 'totals' and its count of
+    'unpriced' rows. A scenario's total equals the total_cost
+    build_cost_table gives with that price table: the rows are added in
+    the same order.
+    """
+    import numpy as np
+
+    unit_prices = unit_price_matrix(summary_table_data, price_tables)
+    outputs = np.array([row_data[4] for row_data in summary_table_data], dtype=float)
+    unpriced = np.isnan(unit_prices)
+    total_prices = outputs[:, np.newaxis] * np.where(unpriced, 0.0, unit_prices)
+
+    if len(price_tables) == 1:
+        # NumPy sums a single column pairwise, so add it up in row order here
+        totals = np.array([sum(total_prices[:, 0].tolist())], dtype=float)
+    elif len(summary_table_data):
+        # Summing down the rows of a C-ordered matrix adds them one at a time, in row order
+        totals = np.add.reduce(total_prices, axis=0)
+    else:
+        totals = np.zeros(len(price_tables))
+
+    return {
+        'unit_prices': unit_prices,
+        'total_prices': total_prices,
+        'totals': totals,
+        'unpriced': unpriced.sum(axis=0)
+    }
+
+
+def comparison_table(names: List[str], paths: List[str], result: Dict, baseline: int = 0) -> List[List]:
+    """One row per scenario with its total and its delta from the baseline scenario"""
+    base_total = result['totals'][baseline]
+    rows = []
+    for name, path, total, unpriced in zip(names, paths, result['totals'].tolist(), result['unpriced'].tolist()):
+        delta = total - base_total
+        delta_percent = delta / base_total * 100 if base_total else 0.0
+        rows.append([name, path, total, delta, delta_percent, unpriced])
+    return rows
+
+
+def detail_table(summary_table_data: List[List], names: List[str], result: Dict) -> Tuple[List[str], List[List]]:
+    """Headers and rows of the summary table with each scenario's unit and total price appended"""
+    headers = list(SUMMARY_HEADERS)
+    for name in names:
+        headers += [f"{name} Unit Price", f"{name} Total Price"]
+
+    rows = []
+    for row_data, unit_prices, total_prices in zip(summary_table_data, result['unit_prices'].tolist(),
+                                                   result['total_prices'].tolist()):
+        row = list(row_data[:5])
+        for unit_price, total_price in zip(unit_prices, total_prices):
+            row += ['' if math.isnan(unit_price) else unit_price, total_price]
+        rows.append(row)
+    return headers, rows
+
+
+def write_comparison_table(filename: str, comparison_rows: List[List]):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COMPARISON_HEADERS)
+        writer.writerows(comparison_rows)
+
+
+def write_detail_table(filename: str, headers: List[str], rows: List[List]):
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Price one parts list under many price tables")
+    parser.add_argument('parts_list', help="Parts list file")
+    parser.add_argument('scenarios', nargs='+', help="Scenario price table CSVs, directories or glob patterns")
+    parser.add_argument('--output', required=True, help="Comparison table CSV, one row per scenario")
+    parser.add_argument('--price-table', default="price_table.csv",
+                        help="Baseline price table the deltas are measured from")
+    parser.add_argument('--detail', help="Also write every summary row's price under every scenario to this CSV")
+    parser.add_argument('--cache', action='store_true',
+                        help="Read and write the binary parsed-table cache next to the parts list")
+    args = parser.parse_args(argv)
+
+    from batch import collect_parts_lists
+    paths = [args.price_table] + [path for path in collect_parts_lists(args.scenarios, '*.csv')
+                                  if os.path.abspath(path) != os.path.abspath(args.price_table)]
+    if len(paths) == 1:
+        print("No scenario price tables found", file=sys.stderr)
+        return 1
+
+    price_tables = [get_price_table(path) for path in paths]
+    for path, price_data in zip(paths, price_tables):
+        if not price_data:
+            print(f"Price table not found or empty: {path}", file=sys.stderr)
+            return 1
+
+    try:
+        summary_table_data = PricingEngine(args.price_table).price_file(args.parts_list, cache=args.cache)[
+            'summary_table']
+    except Exception as e:
+        print(f"{args.parts_list}: ERROR {e}", file=sys.stderr)
+        return 1
+
+    names = ['baseline'] + [scenario_name(path) for path in paths[1:]]
+    result = price_scenarios(summary_table_data, price_tables)
+    comparison_rows = comparison_table(names, paths, result)
+    write_comparison_table(args.output, comparison_rows)
+    if args.detail:
+        write_detail_table(args.detail, *detail_table(summary_table_data, names, result))
+
+    for name, _, total, delta, delta_percent, unpriced in comparison_rows:
+        print(f"{name}: {total:.2f} ({delta:+.2f}, {delta_percent:+.1f}%)" +
+              (f", {unpriced} unpriced rows" if unpriced else ""))
+    print(f"{len(paths) - 1} scenarios compared with {args.price_table} -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
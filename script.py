@@ -1,22 +1,152 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import csv
 import os
-from typing import List, Dict, Tuple
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import engine
+import parts_cache
+import scenarios
+from instrumentation import RunProfiler, StageTimer
+from price_catalog import PriceCatalog
+from rollup import CostRollup
+
+# Pause in typing, in ms, before the price table editor's search is applied
+FILTER_DELAY_MS = 200
+
+
+class LoadCancelled(Exception):
+    """Raised on the loader thread when the user cancels a file load"""
+
+
+class VirtualTreeview:
+    """Scrolls a Treeview over any number of rows with one item per visible line.
+    
+    row_count() gives the number of rows and row_values(position) the values
+    and tags of the row at a position. The items are refilled as the view
+    scrolls, so widget cost stays flat however many rows there are.
+    before_scroll, if given, is called before the items show other rows.
+    """
+    
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, row_count: Callable[[], int],
+                 row_values: Callable[[int], Tuple[List, Tuple]], before_scroll: Callable[[], None] = None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_count = row_count
+        self.row_values = row_values
+        self.before_scroll = before_scroll
+        # Position of the row in the top item, and the Treeview items, one per visible line
+        self.offset = 0
+        self.slots = []
+        
+        # The vertical scrollbar scrolls the rows, not the Treeview items
+        scrollbar.configure(command=self.scroll)
+        tree.bind('<Configure>', lambda e: self.refresh())
+        tree.bind('<MouseWheel>', self.on_mouse_wheel)
+        tree.bind('<Button-4>', self.on_mouse_wheel)
+        tree.bind('<Button-5>', self.on_mouse_wheel)
+        tree.bind('<Prior>', lambda e: self.scroll('scroll', -1, 'pages'))
+        tree.bind('<Next>', lambda e: self.scroll('scroll', 1, 'pages'))
+    
+    def visible_rows(self) -> int:
+        """Number of rows that fit in the Treeview at its current size"""
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        height = self.tree.winfo_height()
+        if height <= 1:
+            # Not laid out yet
+            return int(self.tree['height'])
+        # One row's worth of height is taken by the headings
+        return max(1, height // row_height - 1)
+    
+    def refresh(self):
+        """Fill the items with the rows from offset, adding or removing items to fit"""
+        row_count = self.row_count()
+        visible = self.visible_rows()
+        self.offset = max(0, min(self.offset, row_count - visible))
+        count = max(0, min(visible, row_count - self.offset))
+        
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert('', 'end'))
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+        
+        for position, slot in enumerate(self.slots, self.offset):
+            values, tags = self.row_values(position)
+            self.tree.item(slot, values=values, tags=tags)
+        
+        if row_count:
+            self.scrollbar.set(self.offset / row_count, (self.offset + count) / row_count)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def clear_selection(self):
+        self.tree.selection_remove(self.tree.selection())
+    
+    def set_offset(self, offset: int):
+        if offset != self.offset:
+            if self.before_scroll is not None:
+                self.before_scroll()
+            # The items are about to show other rows
+            self.clear_selection()
+            self.offset = offset
+            self.refresh()
+    
+    def scroll(self, *args):
+        """Vertical scrollbar command: ('moveto', fraction) or ('scroll', count, 'units' or 'pages')"""
+        if args[0] == 'moveto':
+            self.set_offset(int(float(args[1]) * self.row_count()))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (max(1, len(self.slots)) if args[2] == 'pages' else 1)
+            self.set_offset(max(0, self.offset + step))
+        return 'break'
+    
+    def on_mouse_wheel(self, event):
+        up = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self.scroll('scroll', -3 if up else 3, 'units')
+        return 'break'
+    
+    def position(self, item: str) -> Optional[int]:
+        """Position of the row an item shows, or None"""
+        if item in self.slots:
+            return self.offset + self.slots.index(item)
+        return None
+    
+    def selected_positions(self) -> List[int]:
+        """Positions of the selected rows"""
+        return [self.offset + self.slots.index(item) for item in self.tree.selection() if item in self.slots]
+
 
 class PartsListProcessor:
-    def __init__(self, root):
+    def __init__(self, root, timings_log: str = None, profile_path: str = None):
         self.root = root
         self.root.title("Parts List Processor")
         self.root.geometry("1200x700")
         
         # Data storage
-        self.parts_data = []
-        self.quantity_table_data = []
+        self.quantity_table_data = engine.QuantityTable()
         self.summary_table_data = []
         self.cost_table_data = []
         self.deleted_rows = set()  # Track deleted rows
+        self.dirty_rows = {}  # Edited display values of the rows not recalculated yet, by row index
+        self.summary_dict = {}  # Summary totals, kept up to date as rows change
+        self.summary_counts = {}  # Number of rows in each summary group
+        self.summary_stats = {}  # [min, max] formula output of each group, None until computed again
+        self.group_rows = None  # Row indices of each summary group, built the first time a group needs it
         self.price_table_path = "price_table.csv"
+        self.filename = ""  # Parts list currently shown
+        self.rollup = CostRollup()  # Consolidated summary of the parts lists added to the rollup
+        
+        # Stage timings, shown in the status bar and appended to timings_log if given
+        self.timings_log = timings_log
+        self.profile_path = profile_path  # Profile each load into this file
+        self.load_timer = StageTimer()
+        
+        # Background file loading
+        self.load_thread = None
+        self.load_queue = queue.Queue()
+        self.load_cancel = threading.Event()
         
         # Create main frame
         self.main_frame = ttk.Frame(root, padding="10")
@@ -42,6 +172,12 @@ class PartsListProcessor:
         ttk.Button(upload_frame, text="Upload Parts List", command=self.upload_file).pack(side=tk.LEFT, padx=5)
         ttk.Button(upload_frame, text="Edit Price Table", command=self.edit_price_table).pack(side=tk.LEFT, padx=5)
         
+        # Load progress, only shown while a file loads
+        self.progress_frame = ttk.Frame(upload_frame)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, length=300, maximum=100)
+        self.progress_bar.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.progress_frame, text="Cancel", command=self.cancel_load).pack(side=tk.LEFT, padx=5)
+        
         # Table frame
         self.table_frame = ttk.Frame(self.main_frame)
         self.table_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -58,21 +194,7 @@ class PartsListProcessor:
     
     def initialize_price_table(self):
         """Create a default price table CSV if it doesn't exist"""
-        if not os.path.exists(self.price_table_path):
-            headers = ['Door model', 'Color category', 'Color code', 'Cabinet', 'Wardrobe', 
-                      'NAMA', 'Safhe 60', 'Safhe 65', 'Safhe 75', 'Safhe 90', 'Safhe 100', 
-                      'Safhe 120', 'Open shelf', 'Shelf', 'Kesho', 'Tabaghe', 'Description']
-            
-            with open(self.price_table_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-                # Add some example rows
-                writer.writerow(['MO1', 'TYPE', 'TISAN', '1000', '1200', '800', '500', '550', 
-                               '600', '650', '700', '750', '900', '1100', '1300', '1500', 'Example'])
-                writer.writerow(['MO10', 'TYPE', 'TISAN', '1100', '1300', '850', '520', '570', 
-                               '620', '670', '720', '770', '920', '1150', '1350', '1550', 'Example'])
-                writer.writerow(['MO7', 'TYPE', 'TISAN', '1050', '1250', '825', '510', '560', 
-                               '610', '660', '710', '760', '910', '1125', '1325', '1525', 'Example'])
+        engine.initialize_price_table(self.price_table_path)
     
     def upload_file(self):
         filename = filedialog.askopenfilename(
@@ -84,318 +206,338 @@ class PartsListProcessor:
             self.process_parts_list(filename)
     
     def process_parts_list(self, filename):
-        """Process the uploaded parts list file"""
+        """Process the uploaded parts list file on a worker thread"""
+        if self.load_thread is not None and self.load_thread.is_alive():
+            messagebox.showinfo("Busy", "A parts list is already loading")
+            return
+        
+        try:
+            self.load_size = max(os.path.getsize(filename), 1)
+        except OSError as e:
+            messagebox.showerror("Error", f"Error processing file: {str(e)}")
+            return
+        
+        self.load_queue = queue.Queue()
+        self.load_cancel = threading.Event()
+        self.load_started = time.perf_counter()
+        
+        self.progress_bar['value'] = 0
+        self.progress_frame.pack(side=tk.LEFT, padx=5)
+        self.status_label.config(text=f"Loading {os.path.basename(filename)}...")
+        
+        self.load_thread = threading.Thread(target=self.load_parts_list,
+                                            args=(filename, self.load_queue, self.load_cancel), daemon=True)
+        self.load_thread.start()
+        self.root.after(100, self.poll_load_queue)
+    
+    def load_parts_list(self, filename, results: queue.Queue, cancel: threading.Event):
+        """Parse a parts list and compute its formulas and summary totals.
+        
+        Runs on the loader thread, so it must not touch any widget. Progress
+        and results are passed back through the results queue.
+        """
+        def progress(bytes_read, rows):
+            if cancel.is_set():
+                raise LoadCancelled()
+            results.put(('progress', bytes_read, rows))
+        
+        timer = StageTimer()
+        profiler = RunProfiler(self.profile_path) if self.profile_path else None
+        if profiler is not None:
+            profiler.start()
+        
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            # Reuses the binary cache next to the file when it's still fresh
+            # Large files are split across every core
+            quantity_table_data = parts_cache.load_quantity_table(filename, progress, timer=timer,
+                                                                  workers=os.cpu_count() or 1)
+            if cancel.is_set():
+                raise LoadCancelled()
             
-            self.parts_data = []
-            self.deleted_rows = set()  # Reset deleted rows
+            with timer.stage('summary', len(quantity_table_data)):
+                summary_dict, summary_counts, summary_stats = quantity_table_data.summarize()
             
-            for line in lines:
-                columns = line.strip().split('\t')
-                if len(columns) >= 14 and 'ADIN' in columns[0]:
-                    self.parts_data.append(columns)
+            results.put(('done', filename, quantity_table_data, summary_dict, summary_counts, summary_stats, timer))
+        except LoadCancelled:
+            results.put(('cancelled',))
+        except Exception as e:
+            results.put(('error', str(e)))
+        finally:
+            if profiler is not None:
+                profiler.stop()
+    
+    def poll_load_queue(self):
+        """Apply messages from the loader thread, then poll again until it finishes"""
+        while True:
+            try:
+                message = self.load_queue.get_nowait()
+            except queue.Empty:
+                break
             
-            if self.parts_data:
-                self.create_quantity_table()
-                self.status_label.config(text=f"Loaded {len(self.parts_data)} ADIN parts")
+            if message[0] == 'progress':
+                self.show_load_progress(message[1], message[2])
             else:
+                self.progress_frame.pack_forget()
+                self.finish_load(message)
+                return
+        
+        self.root.after(100, self.poll_load_queue)
+    
+    def show_load_progress(self, bytes_read: int, rows: int):
+        """Show how far the loader thread got and an estimate of the time left"""
+        fraction = min(bytes_read / self.load_size, 1.0)
+        self.progress_bar['value'] = fraction * 100
+        
+        elapsed = time.perf_counter() - self.load_started
+        if fraction > 0:
+            time_left = elapsed * (1 - fraction) / fraction
+            self.status_label.config(text=f"Parsed {rows} ADIN rows ({fraction:.0%}), about {time_left:.0f} s left")
+    
+    def finish_load(self, message: Tuple):
+        """Show the result of a finished, cancelled or failed load"""
+        if message[0] == 'cancelled':
+            self.status_label.config(text="Loading cancelled")
+        elif message[0] == 'error':
+            messagebox.showerror("Error", f"Error processing file: {message[1]}")
+            self.status_label.config(text="Please upload a parts list file")
+        else:
+            _, filename, quantity_table_data, summary_dict, summary_counts, summary_stats, timer = message
+            if not len(quantity_table_data):
                 messagebox.showwarning("No Data", "No ADIN parts found in the file")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error processing file: {str(e)}")
+                self.status_label.config(text="Please upload a parts list file")
+                return
+            
+            self.filename = filename
+            self.quantity_table_data = quantity_table_data
+            self.summary_dict = summary_dict
+            self.summary_counts = summary_counts
+            self.summary_stats = summary_stats
+            self.group_rows = None
+            self.deleted_rows = set()  # Reset deleted rows
+            self.dirty_rows = {}
+            self.load_timer = timer
+            self.create_quantity_table()
+    
+    def cancel_load(self):
+        """Ask the loader thread to stop"""
+        self.load_cancel.set()
+        self.status_label.config(text="Cancelling...")
     
     def calculate_formula(self, part_type: str, L: float, P: float, H: float) -> float:
         """Calculate the formula output based on part type"""
-        # Convert mm to meters
-        L = L / 1000
-        P = P / 1000
-        H = H / 1000
-        
-        part_type = part_type.upper()
-        
-        # Base and Tall
-        if part_type.startswith('BASE') or part_type.startswith('TALL'):
-            return P * (H / 0.72) * L
-        
-        # Wall
-        elif part_type.startswith('WALL'):
-            # Calculate Factor_H
-            if H <= 0.40:
-                factor_h = 0.25
-            elif H <= 0.50:
-                factor_h = 0.30
-            elif H <= 0.60:
-                factor_h = 0.35
-            elif H <= 0.70:
-                factor_h = 0.40
-            else:
-                factor_h = 0.40 + (H - 0.70)
-            
-            # Calculate Factor_P
-            factor_p = (P - 0.30) / 2
-            
-            return (factor_h + factor_p) * L
-        
-        # NAMA variants
-        elif part_type.startswith('NAMA U'):
-            return (P + L + 0.08) * H
-        elif part_type.startswith('NAMA L'):
-            return (P + L) * H
-        elif part_type.startswith('NAMA 16') or part_type.startswith('NAMA16'):
-            return H * P
-        elif part_type.startswith('NAMA 32'):
-            return H * P * 2
-        elif part_type.startswith('NAMA CNC'):
-            return L * P * 2
-        elif part_type.startswith('NAMA VER 16'):
-            return L * P
-        elif part_type.startswith('NAMA VER 32'):
-            return L * P * 2
-        elif part_type.startswith('NAMA HOR WITH LIGHT'):
-            factor_light = 0.55  # 550mm converted to meters
-            return L * P + L * factor_light
-        elif part_type.startswith('NAMA VER WITH LIGHT'):
-            factor_light = 0.55
-            return H * P + H * factor_light
-        
-        # Open shelf and Shelf
-        elif part_type.startswith('OPEN SHELF'):
-            return (L * P) * 2 + (H * P) * 2 + (L * H)
-        elif part_type.startswith('SHELF'):
-            factor_farsi = 2 * (2 * P + L + H)
-            return (L * P) * 2 + (H * P) * 2 + (L * H) * 2 + factor_farsi
-        
-        # SAFHE variants
-        elif any(part_type.startswith(f'SAFHE {x}') for x in ['60', '65', '75', '90', '100', '120']):
-            return L * 1000  # Return in mm for linear measurements
-        
-        # Ward
-        elif part_type.startswith('WARD'):
-            if P <= 0.30:
-                factor_p = 0.45
-            elif P <= 0.40:
-                factor_p = 0.50
-            elif P <= 0.50:
-                factor_p = 0.55
-            elif P <= 0.60:
-                factor_p = 0.60
-            elif P <= 0.70:
-                factor_p = 0.65
-            elif P <= 0.80:
-                factor_p = 0.70
-            elif P <= 0.90:
-                factor_p = 0.75
-            elif P <= 1.00:
-                factor_p = 0.80
-            elif P <= 1.10:
-                factor_p = 0.85
-            else:
-                factor_p = 0.90
-            return L * H * factor_p
-        
-        # Kesho
-        elif part_type.startswith('KESHO'):
-            return P * (H / 0.72) * L * 2
-        
-        # Tabaghe
-        elif part_type.startswith('TABAGHE'):
-            # Extract number from type
-            for i in range(1, 7):
-                if f'TABAGHE {i}' in part_type.upper() or f'TABAGHE{i}' in part_type.upper():
-                    return L * P * H * i
-        
-        return 0.0
+        return engine.calculate_formula(part_type, L, P, H)
     
     def create_quantity_table(self):
-        """Create and display the quantity table with fixed headers"""
+        """Create and display the quantity table as an editable Treeview.
+        
+        The Treeview only holds one item per visible line, filled from the
+        QuantityTable as it scrolls, so build time and Tk memory stay flat as
+        the row count grows. Cells are edited in place by double-clicking them.
+        """
+        widgets_started = time.perf_counter()
+        
         # Clear existing widgets
         for widget in self.table_frame.winfo_children():
             widget.destroy()
         for widget in self.button_frame.winfo_children():
             widget.destroy()
         
-        # Create container frame for headers and scrollable content
         container_frame = ttk.Frame(self.table_frame)
         container_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         container_frame.columnconfigure(0, weight=1)
-        container_frame.rowconfigure(1, weight=1)
-        
-        # Create headers frame (fixed)
-        headers_frame = ttk.Frame(container_frame)
-        headers_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
-        
-        # Create headers
-        headers = ["Type", "L (mm)", "P (mm)", "H (mm)", "Door Model", 
-                  "Color Category", "Color Code", "Formula Output", "Delete"]
-        
-        for col, header in enumerate(headers):
-            label = ttk.Label(headers_frame, text=header, font=('Arial', 10, 'bold'), relief=tk.RIDGE)
-            label.grid(row=0, column=col, padx=1, pady=1, sticky=(tk.W, tk.E))
-            if col < 8:
-                headers_frame.columnconfigure(col, minsize=120)
-            else:
-                headers_frame.columnconfigure(col, minsize=70)
+        container_frame.rowconfigure(0, weight=1)
         
-        # Create scrollable frame for data
-        data_container = ttk.Frame(container_frame)
-        data_container.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        data_container.columnconfigure(0, weight=1)
-        data_container.rowconfigure(0, weight=1)
+        self.quantity_tree = ttk.Treeview(container_frame, columns=engine.QUANTITY_HEADERS, height=20,
+                                          show='headings', selectmode='extended')
+        scrollbar_y = ttk.Scrollbar(container_frame, orient="vertical")
+        scrollbar_x = ttk.Scrollbar(container_frame, orient="horizontal", command=self.quantity_tree.xview)
+        self.quantity_tree.configure(xscrollcommand=scrollbar_x.set)
         
-        canvas = tk.Canvas(data_container, highlightthickness=0)
-        scrollbar_y = ttk.Scrollbar(data_container, orient="vertical", command=canvas.yview)
-        scrollbar_x = ttk.Scrollbar(container_frame, orient="horizontal", command=canvas.xview)
-        scrollable_frame = ttk.Frame(canvas)
+        for header in engine.QUANTITY_HEADERS:
+            self.quantity_tree.heading(header, text=header)
+            self.quantity_tree.column(header, width=120, stretch=False)
+        self.quantity_tree.tag_configure('deleted', foreground='gray')
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        self.quantity_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        scrollbar_x.grid(row=1, column=0, sticky=(tk.W, tk.E))
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        self.quantity_view = VirtualTreeview(self.quantity_tree, scrollbar_y, lambda: len(self.quantity_table_data),
+                                             self.quantity_row_display,
+                                             before_scroll=lambda: self.close_cell_editor(save=True))
+        self.quantity_tree.bind('<Double-1>', self.edit_quantity_cell)
+        self.quantity_tree.bind('<Delete>', lambda e: self.delete_selected_rows())
+        self.cell_editor = None
         
-        # Process data and create table rows
-        self.quantity_table_data = []
-        self.entry_widgets = []
+        # Add buttons
+        ttk.Button(self.button_frame, text="Delete Selected", command=self.delete_selected_rows).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Recalculate", command=self.recalculate_formulas).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Approve and Continue", command=self.create_summary_table).pack(side=tk.LEFT, padx=5)
         
-        for row_idx, part in enumerate(self.parts_data):
+        self.quantity_view.refresh()
+        self.load_timer.add('widgets', time.perf_counter() - widgets_started, len(self.quantity_view.slots))
+        self.report_timings(self.load_timer, 'load', f"Loaded {len(self.quantity_table_data)} ADIN parts. "
+                                                     "Double-click a cell to edit it, then click 'Recalculate'.")
+    
+    def report_timings(self, timer: StageTimer, step: str, message: str):
+        """Show stage timings after a status message, and log them if a timings log is set"""
+        self.status_label.config(text=f"{message} [{timer.status_text()}]")
+        if self.timings_log:
             try:
-                # Extract values
-                part_type = part[1].strip()
-                L = float(part[3].strip()) if part[3].strip() else 0
-                P = float(part[4].strip()) if part[4].strip() else 0
-                H = float(part[5].strip()) if part[5].strip() else 0
-                door_model = part[10].strip() if len(part) > 10 else ""
-                color_category = part[12].strip() if len(part) > 12 else ""
-                color_code = part[13].strip() if len(part) > 13 else ""
-                
-                # Calculate formula
-                formula_output = self.calculate_formula(part_type, L, P, H)
-                
-                # Store data
-                row_data = [part_type, L, P, H, door_model, color_category, color_code, formula_output]
-                self.quantity_table_data.append(row_data)
-                
-                # Create entry widgets for editable cells
-                row_entries = []
-                for col, value in enumerate(row_data):
-                    if col < 7:  # All columns except formula output are editable
-                        entry = ttk.Entry(scrollable_frame, width=15)
-                        entry.insert(0, str(value))
-                        entry.grid(row=row_idx, column=col, padx=1, pady=1)
-                        # Check if this row was previously deleted
-                        if row_idx in self.deleted_rows:
-                            entry.config(state='disabled')
-                        row_entries.append(entry)
-                    else:  # Formula output - display only
-                        label = ttk.Label(scrollable_frame, text=f"{value:.4f}")
-                        label.grid(row=row_idx, column=col, padx=1, pady=1)
-                        row_entries.append(label)
-                
-                # Delete button
-                delete_btn = ttk.Button(scrollable_frame, text="Delete", 
-                                      command=lambda r=row_idx: self.delete_row(r))
-                delete_btn.grid(row=row_idx, column=8, padx=1, pady=1)
-                if row_idx in self.deleted_rows:
-                    delete_btn.config(state='disabled')
-                row_entries.append(delete_btn)
-                
-                self.entry_widgets.append(row_entries)
-                
-            except Exception as e:
-                print(f"Error processing row {row_idx}: {e}")
+                timer.write_log(self.timings_log, filename=self.filename, step=step)
+            except OSError as e:
+                print(f"Error writing timings log: {e}")
+    
+    def quantity_row_values(self, row_data: List) -> List[str]:
+        """Display values of a quantity table row"""
+        return [str(value) for value in row_data[:7]] + [f"{row_data[7]:.4f}"]
+    
+    def quantity_row_display(self, row_idx: int) -> Tuple[List[str], Tuple]:
+        """Values and tags of a quantity row in the Treeview, with any edits not recalculated yet"""
+        values = self.dirty_rows.get(row_idx)
+        if values is None:
+            values = self.quantity_row_values(self.quantity_table_data[row_idx])
+        return values, ('deleted',) if row_idx in self.deleted_rows else ()
+    
+    def edit_quantity_cell(self, event):
+        """Open an entry over the double-clicked cell"""
+        self.close_cell_editor(save=True)
+        
+        item = self.quantity_tree.identify_row(event.y)
+        column = self.quantity_tree.identify_column(event.x)
+        row_idx = self.quantity_view.position(item) if item else None
+        if row_idx is None or not column:
+            return
         
-        # Configure column widths in scrollable frame to match headers
-        for col in range(9):
-            if col < 8:
-                scrollable_frame.columnconfigure(col, minsize=120)
-            else:
-                scrollable_frame.columnconfigure(col, minsize=70)
+        # Formula output is display only, and deleted rows can't be edited
+        col = int(column[1:]) - 1
+        if col >= 7 or row_idx in self.deleted_rows:
+            return
         
-        # Pack scrollbars and canvas
-        canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        scrollbar_x.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        bbox = self.quantity_tree.bbox(item, column)
+        if not bbox:
+            return
         
-        # Add buttons
-        ttk.Button(self.button_frame, text="Recalculate", command=self.recalculate_formulas).pack(side=tk.LEFT, padx=5)
-        ttk.Button(self.button_frame, text="Approve and Continue", command=self.create_summary_table).pack(side=tk.LEFT, padx=5)
+        x, y, width, height = bbox
+        self.cell_editor = ttk.Entry(self.quantity_tree)
+        self.cell_editor.place(x=x, y=y, width=width, height=height)
+        self.cell_editor.insert(0, self.quantity_row_display(row_idx)[0][col])
+        self.cell_editor.select_range(0, tk.END)
+        self.cell_editor.focus_set()
+        self.cell_editor.row_idx = row_idx
+        self.cell_editor.col = col
+        
+        self.cell_editor.bind('<Return>', lambda e: self.close_cell_editor(save=True))
+        self.cell_editor.bind('<FocusOut>', lambda e: self.close_cell_editor(save=True))
+        self.cell_editor.bind('<Escape>', lambda e: self.close_cell_editor(save=False))
+    
+    def close_cell_editor(self, save: bool):
+        """Close the cell entry, keeping its value as an edit of the row if requested"""
+        if self.cell_editor is None:
+            return
         
-        self.status_label.config(text="Quantity table created. You can edit values and click 'Recalculate'.")
+        editor, self.cell_editor = self.cell_editor, None
+        if save:
+            value = editor.get()
+            values = list(self.quantity_row_display(editor.row_idx)[0])
+            if value != values[editor.col]:
+                values[editor.col] = value
+                self.dirty_rows[editor.row_idx] = values
+                self.quantity_view.refresh()
+        editor.destroy()
+    
+    def delete_selected_rows(self):
+        """Mark the selected rows for deletion"""
+        for row_idx in self.quantity_view.selected_positions():
+            self.delete_row(row_idx)
+        self.quantity_view.refresh()
     
     def delete_row(self, row_index):
         """Mark row for deletion"""
-        if 0 <= row_index < len(self.entry_widgets):
+        if 0 <= row_index < len(self.quantity_table_data) and row_index not in self.deleted_rows:
             self.deleted_rows.add(row_index)
-            for widget in self.entry_widgets[row_index]:
-                if isinstance(widget, (ttk.Entry, ttk.Label)):
-                    widget.config(state='disabled')
-                elif isinstance(widget, ttk.Button):
-                    widget.config(state='disabled')
+            self.dirty_rows.pop(row_index, None)
+            engine.remove_from_summary(self.summary_dict, self.quantity_table_data[row_index], self.summary_counts,
+                                       self.summary_stats)
     
     def recalculate_formulas(self):
-        """Recalculate formulas based on current entry values"""
-        for row_idx, row_entries in enumerate(self.entry_widgets):
+        """Recalculate formulas of the rows edited since the last recalculation.
+        
+        The summary totals are updated by taking each edited row's old
+        contribution out and adding its new one.
+        """
+        self.close_cell_editor(save=True)
+        
+        recalculated = 0
+        for row_idx in sorted(self.dirty_rows):
             try:
-                # Skip deleted rows
-                if row_idx in self.deleted_rows:
-                    continue
-                
-                # Get current values
-                part_type = row_entries[0].get()
-                L = float(row_entries[1].get())
-                P = float(row_entries[2].get())
-                H = float(row_entries[3].get())
+                values = self.dirty_rows[row_idx]
+                part_type = values[0]
+                L = float(values[1])
+                P = float(values[2])
+                H = float(values[3])
                 
                 # Recalculate formula
                 formula_output = self.calculate_formula(part_type, L, P, H)
                 
-                # Update formula output label
-                row_entries[7].config(text=f"{formula_output:.4f}")
-                
-                # Update stored data
-                self.quantity_table_data[row_idx] = [
+                # Update stored data and summary totals
+                row_data = [
                     part_type,
                     L, P, H,
-                    row_entries[4].get(),
-                    row_entries[5].get(),
-                    row_entries[6].get(),
+                    values[4],
+                    values[5],
+                    values[6],
                     formula_output
                 ]
+                engine.remove_from_summary(self.summary_dict, self.quantity_table_data[row_idx], self.summary_counts,
+                                           self.summary_stats)
+                engine.add_to_summary(self.summary_dict, row_data, self.summary_counts, self.summary_stats)
+                self.quantity_table_data[row_idx] = row_data
+                if self.group_rows is not None:
+                    self.group_rows.setdefault(engine.summary_key(row_data), []).append(row_idx)
+                
+                # Rows that fail to parse stay dirty so they are retried next time
+                del self.dirty_rows[row_idx]
+                recalculated += 1
                 
             except Exception as e:
                 print(f"Error recalculating row {row_idx}: {e}")
         
-        self.status_label.config(text="Formulas recalculated")
+        if recalculated and self.quantity_tree.winfo_exists():
+            self.quantity_view.refresh()
+        self.status_label.config(text=f"Formulas recalculated for {recalculated} edited rows")
+    
+    def update_summary_stats(self) -> int:
+        """Compute the min and max again for the groups whose min or max row was edited or deleted.
+        
+        Only the rows of those groups are read. Returns the number of groups updated.
+        """
+        stale = [key for key, stats in self.summary_stats.items() if stats is None]
+        if stale and self.group_rows is None:
+            self.group_rows = self.quantity_table_data.group_rows(self.deleted_rows)
+        
+        for key in stale:
+            # Rows moved to another group by an edit are still listed under their old one
+            outputs = [self.quantity_table_data.outputs[row_idx] for row_idx in self.group_rows.get(key, ())
+                       if row_idx not in self.deleted_rows and
+                       engine.summary_key(self.quantity_table_data[row_idx]) == key]
+            self.summary_stats[key] = [min(outputs), max(outputs)]
+        return len(stale)
     
     def create_summary_table(self):
         """Create and display the summary table with fixed headers"""
-        # First, update quantity table data with current values
-        self.recalculate_formulas()
+        timer = StageTimer()
         
-        # Group data by type, door model, color category, and color code
-        summary_dict = {}
+        # First, update quantity table data with current values
+        with timer.stage('recalculate', len(self.dirty_rows)):
+            self.recalculate_formulas()
         
-        for row_idx, row_data in enumerate(self.quantity_table_data):
-            # Skip deleted rows
-            if row_idx in self.deleted_rows:
-                continue
-            
-            part_type = self.normalize_type(row_data[0])
-            door_model = row_data[4]
-            color_category = row_data[5]
-            color_code = row_data[6]
-            formula_output = row_data[7]
-            
-            key = (part_type, door_model, color_category, color_code)
-            
-            if key in summary_dict:
-                summary_dict[key] += formula_output
-            else:
-                summary_dict[key] = formula_output
+        # Summary totals by type, door model, color category, and color code are already up to date
+        with timer.stage('summary', len(self.summary_dict)):
+            self.summary_table_data = engine.summary_rows(self.summary_dict)
+        with timer.stage('stats') as record:
+            record['rows'] = self.update_summary_stats()
+        widgets_started = time.perf_counter()
         
         # Clear existing widgets
         for widget in self.table_frame.winfo_children():
@@ -414,7 +556,7 @@ class PartsListProcessor:
         headers_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
         
         # Create headers
-        headers = ["Type", "Door Model", "Color Category", "Color Code", "Total Formula Output"]
+        headers = engine.SUMMARY_STATS_HEADERS
         
         for col, header in enumerate(headers):
             label = ttk.Label(headers_frame, text=header, font=('Arial', 10, 'bold'), relief=tk.RIDGE)
@@ -441,16 +583,12 @@ class PartsListProcessor:
         canvas.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
         
         # Create summary rows
-        self.summary_table_data = []
-        
-        for row_idx, (key, total) in enumerate(sorted(summary_dict.items())):
-            part_type, door_model, color_category, color_code = key
-            
-            row_data = [part_type, door_model, color_category, color_code, total]
-            self.summary_table_data.append(row_data)
-            
-            for col, value in enumerate(row_data):
-                if col == 4:  # Formula output
+        for row_idx, row_data in enumerate(self.summary_table_data):
+            key = tuple(row_data[:4])
+            row_count = self.summary_counts.get(key, 0)
+            low, high = self.summary_stats.get(key) or (0.0, 0.0)
+            for col, value in enumerate(row_data + [row_count, low, high]):
+                if col == 4 or col >= 6:  # Formula outputs
                     text = f"{value:.4f}"
                 else:
                     text = str(value)
@@ -467,40 +605,21 @@ class PartsListProcessor:
         ttk.Button(self.button_frame, text="Approve and Calculate Costs", 
                   command=self.create_cost_table).pack(side=tk.LEFT, padx=5)
         
-        self.status_label.config(text=f"Summary table created with {len(self.summary_table_data)} rows")
+        timer.add('widgets', time.perf_counter() - widgets_started, len(self.summary_table_data))
+        self.report_timings(timer, 'summary', f"Summary table created with {len(self.summary_table_data)} rows")
     
     def normalize_type(self, part_type: str) -> str:
         """Normalize part type for grouping"""
-        part_type = part_type.upper()
-        
-        type_groups = {
-            'BASE': 'Base',
-            'TALL': 'Tall',
-            'WALL': 'Wall',
-            'NAMA': 'NAMA',
-            'SAFHE 60': 'Safhe 60',
-            'SAFHE 65': 'Safhe 65',
-            'SAFHE 75': 'Safhe 75',
-            'SAFHE 90': 'Safhe 90',
-            'SAFHE 100': 'Safhe 100',
-            'SAFHE 120': 'Safhe 120',
-            'WARD': 'Ward',
-            'OPEN SHELF': 'Open shelf',
-            'SHELF': 'Shelf',
-            'KESHO': 'Kesho',
-            'TABAGHE': 'Tabaghe'
-        }
-        
-        for prefix, normalized in type_groups.items():
-            if part_type.startswith(prefix):
-                return normalized
-        
-        return part_type
+        return engine.normalize_type(part_type)
     
     def create_cost_table(self):
         """Create and display the cost table with fixed headers"""
+        timer = StageTimer()
+        
         # Load price table
-        price_data = self.load_price_table()
+        with timer.stage('prices') as record:
+            price_data = self.load_price_table()
+            record['rows'] = len(price_data)
         
         if not price_data:
             messagebox.showerror("Error", "Price table not found or empty. Please edit the price table first.")
@@ -524,7 +643,7 @@ class PartsListProcessor:
         
         # Create headers
         headers = ["Type", "Door Model", "Color Category", "Color Code", 
-                  "Total Formula Output", "Unit Price", "Total Price"]
+                  "Total Formula Output", "Unit Price", "Total Price", "Price Rule"]
         
         for col, header in enumerate(headers):
             label = ttk.Label(headers_frame, text=header, font=('Arial', 10, 'bold'), relief=tk.RIDGE)
@@ -551,28 +670,11 @@ class PartsListProcessor:
         canvas.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
         
         # Create cost rows
-        self.cost_table_data = []
-        total_cost = 0
+        with timer.stage('cost', len(self.summary_table_data)):
+            self.cost_table_data, total_cost = engine.build_cost_table(self.summary_table_data, price_data)
+        widgets_started = time.perf_counter()
         
-        for row_idx, row_data in enumerate(self.summary_table_data):
-            part_type = row_data[0]
-            door_model = row_data[1]
-            color_category = row_data[2]
-            color_code = row_data[3]
-            formula_output = row_data[4]
-            
-            # Get unit price
-            unit_price = self.get_unit_price(part_type, door_model, color_category, 
-                                            color_code, price_data)
-            
-            # Calculate total price
-            total_price = formula_output * unit_price
-            total_cost += total_price
-            
-            # Store data
-            cost_row = row_data + [unit_price, total_price]
-            self.cost_table_data.append(cost_row)
-            
+        for row_idx, cost_row in enumerate(self.cost_table_data):
             # Display row
             for col, value in enumerate(cost_row):
                 if col in [4, 5, 6]:  # Numeric columns
@@ -597,64 +699,26 @@ class PartsListProcessor:
         # Add buttons
         ttk.Button(self.button_frame, text="Export to CSV", 
                   command=self.export_cost_table).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Add to Rollup", 
+                  command=self.add_to_rollup).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Export Rollup", 
+                  command=self.export_rollup).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Compare Price Tables", 
+                  command=self.compare_price_tables).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.button_frame, text="New Analysis", 
                   command=self.reset_analysis).pack(side=tk.LEFT, padx=5)
         
-        self.status_label.config(text=f"Cost table created. Total cost: {total_cost:.2f}")
+        timer.add('widgets', time.perf_counter() - widgets_started, len(self.cost_table_data))
+        self.report_timings(timer, 'cost', f"Cost table created. Total cost: {total_cost:.2f}")
     
-    def load_price_table(self) -> List[Dict]:
-        """Load price table from CSV"""
-        price_data = []
-        
-        try:
-            with open(self.price_table_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    price_data.append(row)
-        except Exception as e:
-            print(f"Error loading price table: {e}")
-        
-        return price_data
+    def load_price_table(self) -> Dict:
+        """Load price table from CSV, reusing the parsed table while the file is unchanged"""
+        return engine.get_price_table(self.price_table_path)
     
     def get_unit_price(self, part_type: str, door_model: str, color_category: str, 
-                      color_code: str, price_data: List[Dict]) -> float:
+                      color_code: str, price_data: Dict) -> float:
         """Get unit price from price table"""
-        # Map part types to price table columns
-        type_to_column = {
-            'Base': 'Cabinet',
-            'Tall': 'Cabinet',
-            'Wall': 'Cabinet',
-            'Ward': 'Wardrobe',
-            'NAMA': 'NAMA',
-            'Safhe 60': 'Safhe 60',
-            'Safhe 65': 'Safhe 65',
-            'Safhe 75': 'Safhe 75',
-            'Safhe 90': 'Safhe 90',
-            'Safhe 100': 'Safhe 100',
-            'Safhe 120': 'Safhe 120',
-            'Open shelf': 'Open shelf',
-            'Shelf': 'Shelf',
-            'Kesho': 'Kesho',
-            'Tabaghe': 'Tabaghe'
-        }
-        
-        price_column = type_to_column.get(part_type, '')
-        
-        if not price_column:
-            return 0.0
-        
-        # Find matching row in price table
-        for row in price_data:
-            if (row.get('Door model', '').upper() == door_model.upper() and
-                row.get('Color category', '').upper() == color_category.upper() and
-                row.get('Color code', '').upper() == color_code.upper()):
-                
-                try:
-                    return float(row.get(price_column, 0))
-                except ValueError:
-                    return 0.0
-        
-        return 0.0
+        return engine.get_unit_price(part_type, door_model, color_category, color_code, price_data)
     
     def export_cost_table(self):
         """Export cost table to CSV"""
@@ -665,27 +729,95 @@ class PartsListProcessor:
         
         if filename:
             try:
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    
-                    # Write headers
-                    headers = ["Type", "Door Model", "Color Category", "Color Code", 
-                             "Total Formula Output", "Unit Price", "Total Price"]
-                    writer.writerow(headers)
-                    
-                    # Write data
-                    for row in self.cost_table_data:
-                        writer.writerow(row)
-                    
-                    # Write total
-                    total = sum(row[6] for row in self.cost_table_data)
-                    writer.writerow(["", "", "", "", "", "TOTAL", total])
+                engine.write_cost_table(filename, self.cost_table_data)
                 
                 messagebox.showinfo("Success", f"Cost table exported to {filename}")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Error exporting file: {str(e)}")
     
+    def add_to_rollup(self):
+        """Add the current parts list to the rollup, replacing it if it was added before"""
+        self.update_summary_stats()
+        groups = {key: [total, self.summary_counts[key]] + self.summary_stats[key]
+                  for key, total in self.summary_dict.items()}
+        parts = len(self.quantity_table_data) - len(self.deleted_rows)
+        self.rollup.set_parts_list(self.filename, groups, parts)
+        
+        self.status_label.config(text=f"Added {os.path.basename(self.filename)} to the rollup "
+                                      f"({len(self.rollup)} parts lists, {self.rollup.parts()} ADIN parts)")
+    
+    def export_rollup(self):
+        """Export the consolidated cost table of every parts list in the rollup to CSV"""
+        if not len(self.rollup):
+            messagebox.showwarning("No Data", "No parts lists have been added to the rollup")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        
+        if filename:
+            try:
+                cost_table_data, total_cost = self.rollup.cost_table(self.load_price_table())
+                engine.write_cost_table(filename, cost_table_data)
+                
+                messagebox.showinfo("Success", f"Rollup of {len(self.rollup)} parts lists exported to "
+                                               f"{filename}. Total cost: {total_cost:.2f}")
+                
+            except Exception as e:
+                messagebox.showerror("Error", f"Error exporting file: {str(e)}")
+    
+    def compare_price_tables(self):
+        """Price the summary table under other price tables and export the totals and deltas to CSV"""
+        filenames = filedialog.askopenfilenames(
+            title="Select scenario price tables",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filenames:
+            return
+        
+        timer = StageTimer()
+        paths = [self.price_table_path] + [path for path in filenames
+                                           if os.path.abspath(path) != os.path.abspath(self.price_table_path)]
+        if len(paths) == 1:
+            messagebox.showerror("Error", "Select at least one price table other than the current one.")
+            return
+        
+        with timer.stage('prices', len(paths)):
+            price_tables = [engine.get_price_table(path) for path in paths]
+        for path, price_data in zip(paths, price_tables):
+            if not price_data:
+                messagebox.showerror("Error", f"Price table not found or empty: {path}")
+                return
+        
+        with timer.stage('scenarios', len(self.summary_table_data)):
+            names = ['baseline'] + [scenarios.scenario_name(path) for path in paths[1:]]
+            result = scenarios.price_scenarios(self.summary_table_data, price_tables)
+            comparison_rows = scenarios.comparison_table(names, paths, result)
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        
+        if filename:
+            try:
+                scenarios.write_comparison_table(filename, comparison_rows)
+                
+                lines = [f"{name}: {total:.2f} ({delta:+.2f}, {delta_percent:+.1f}%)"
+                         for name, _, total, delta, delta_percent, _ in comparison_rows[:15]]
+                if len(comparison_rows) > 15:
+                    lines.append(f"... and {len(comparison_rows) - 15} more")
+                messagebox.showinfo("Success", f"Comparison of {len(paths) - 1} price tables exported to "
+                                               f"{filename}\n\n" + "\n".join(lines))
+                
+            except Exception as e:
+                messagebox.showerror("Error", f"Error exporting file: {str(e)}")
+        
+        self.report_timings(timer, 'scenarios', f"Compared {len(paths) - 1} price tables")
+    
     def edit_price_table(self):
         """Open price table editor"""
         PriceTableEditor(self.root, self.price_table_path)
@@ -693,11 +825,15 @@ class PartsListProcessor:
     def reset_analysis(self):
         """Reset for new analysis"""
         # Clear data
-        self.parts_data = []
-        self.quantity_table_data = []
+        self.quantity_table_data = engine.QuantityTable()
         self.summary_table_data = []
         self.cost_table_data = []
         self.deleted_rows = set()
+        self.dirty_rows = {}
+        self.summary_dict = {}
+        self.summary_counts = {}
+        self.summary_stats = {}
+        self.group_rows = None
         
         # Clear widgets
         for widget in self.table_frame.winfo_children():
@@ -709,13 +845,24 @@ class PartsListProcessor:
 
 
 class PriceTableEditor:
+    """Price table editor for catalogs of any size.
+
+    The rows live in a PriceCatalog; the Treeview only holds one item per
+    visible line (see VirtualTreeview), refilled from the filtered rows.
+    """
+
     def __init__(self, parent, price_table_path):
         self.price_table_path = price_table_path
+        self.catalog = PriceCatalog()
+        # Catalog rows shown, after the search filter
+        self.view = []
+        self.filter_job = None
         
         # Create new window
         self.window = tk.Toplevel(parent)
         self.window.title("Price Table Editor")
         self.window.geometry("1000x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
         
         # Create UI
         self.create_ui()
@@ -732,51 +879,79 @@ class PriceTableEditor:
         self.window.columnconfigure(0, weight=1)
         self.window.rowconfigure(0, weight=1)
         main_frame.columnconfigure(0, weight=1)
-        main_frame.rowconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+        
+        # Search box over door model, color category and color code
+        search_frame = ttk.Frame(main_frame)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Label(search_frame, text="Search door model / color:").pack(side=tk.LEFT, padx=5)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', self.schedule_filter)
+        ttk.Entry(search_frame, textvariable=self.filter_var, width=40).pack(side=tk.LEFT, padx=5)
+        self.count_label = ttk.Label(search_frame, text="")
+        self.count_label.pack(side=tk.LEFT, padx=5)
         
         # Create treeview
-        self.tree = ttk.Treeview(main_frame, height=20)
-        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.tree = ttk.Treeview(main_frame, height=20, show='headings')
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Scrollbars
-        scrollbar_y = ttk.Scrollbar(main_frame, orient="vertical", command=self.tree.yview)
-        scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        scrollbar_y = ttk.Scrollbar(main_frame, orient="vertical")
+        scrollbar_y.grid(row=1, column=1, sticky=(tk.N, tk.S))
         scrollbar_x = ttk.Scrollbar(main_frame, orient="horizontal", command=self.tree.xview)
-        scrollbar_x.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        scrollbar_x.grid(row=2, column=0, sticky=(tk.W, tk.E))
         
-        self.tree.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
+        self.tree.configure(xscrollcommand=scrollbar_x.set)
+        self.tree_view = VirtualTreeview(self.tree, scrollbar_y, lambda: len(self.view),
+                                         lambda position: (self.catalog.rows[self.view[position]], ()))
         
         # Button frame
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=2, column=0, columnspan=2, pady=10)
+        button_frame.grid(row=3, column=0, columnspan=2, pady=10)
         
         ttk.Button(button_frame, text="Add Row", command=self.add_row).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Delete Row", command=self.delete_row).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Import Patch", command=self.import_patch).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Save", command=self.save_data).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Close", command=self.window.destroy).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=self.close).pack(side=tk.LEFT, padx=5)
     
     def load_data(self):
         """Load price table data"""
         try:
-            with open(self.price_table_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                headers = next(reader)
-                
-                # Configure columns
-                self.tree['columns'] = headers
-                self.tree['show'] = 'tree headings'
-                
-                # Set column headings
-                for col in headers:
-                    self.tree.heading(col, text=col)
-                    self.tree.column(col, width=100)
-                
-                # Load data
-                for row in reader:
-                    self.tree.insert('', 'end', values=row)
-                    
+            self.catalog = PriceCatalog.load(self.price_table_path)
         except Exception as e:
             messagebox.showerror("Error", f"Error loading price table: {str(e)}")
+        
+        # Configure columns
+        headers = self.catalog.headers
+        self.tree['columns'] = headers
+        
+        # Set column headings
+        for col in headers:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        
+        self.apply_filter()
+    
+    def schedule_filter(self, *args):
+        """Filter once typing pauses, not on every key"""
+        if self.filter_job is not None:
+            self.window.after_cancel(self.filter_job)
+        self.filter_job = self.window.after(FILTER_DELAY_MS, self.apply_filter)
+    
+    def apply_filter(self, keep_offset: bool = False):
+        """Show the rows matching the search box"""
+        self.filter_job = None
+        self.view = self.catalog.search(self.filter_var.get())
+        if not keep_offset:
+            self.tree_view.clear_selection()
+            self.tree_view.offset = 0
+        self.tree_view.refresh()
+        self.count_label.config(text=f"{len(self.view):,} of {len(self.catalog.rows):,} rows")
+    
+    def selected_rows(self) -> List[int]:
+        """Catalog indices of the selected rows"""
+        return [self.view[position] for position in self.tree_view.selected_positions()]
     
     def add_row(self):
         """Add new row"""
@@ -786,7 +961,7 @@ class PriceTableEditor:
         dialog.geometry("400x500")
         
         entries = []
-        columns = self.tree['columns']
+        columns = self.catalog.headers
         
         for i, col in enumerate(columns):
             ttk.Label(dialog, text=col).grid(row=i, column=0, padx=5, pady=5, sticky=tk.W)
@@ -796,40 +971,74 @@ class PriceTableEditor:
         
         def save_row():
             values = [entry.get() for entry in entries]
-            self.tree.insert('', 'end', values=values)
+            self.catalog.add_row(values)
             dialog.destroy()
+            # Show the new row at the bottom, if the search matches it
+            self.apply_filter()
+            self.tree_view.set_offset(len(self.view))
         
         ttk.Button(dialog, text="Save", command=save_row).grid(row=len(columns), column=0, columnspan=2, pady=10)
     
     def delete_row(self):
         """Delete selected row"""
-        selected = self.tree.selection()
+        selected = self.selected_rows()
         if selected:
-            for item in selected:
-                self.tree.delete(item)
+            self.tree_view.clear_selection()
+            self.catalog.delete_rows(selected)
+            self.apply_filter(keep_offset=True)
+    
+    def import_patch(self):
+        """Update and add rows in bulk from a CSV with the price table's columns"""
+        filename = filedialog.askopenfilename(
+            title="Select price table patch",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        try:
+            result = self.catalog.apply_patch(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error importing patch: {str(e)}")
+            return
+        
+        self.apply_filter(keep_offset=True)
+        message = f"{result['updated']} rows updated, {result['added']} rows added."
+        if result['ignored']:
+            message += f"\nIgnored columns: {', '.join(result['ignored'])}"
+        if result['updated'] or result['added']:
+            message += "\nSave to keep the changes."
+        messagebox.showinfo("Patch Imported", message)
     
     def save_data(self):
         """Save data to CSV"""
         try:
-            with open(self.price_table_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                
-                # Write headers
-                headers = list(self.tree['columns'])
-                writer.writerow(headers)
-                
-                # Write data
-                for item in self.tree.get_children():
-                    values = self.tree.item(item)['values']
-                    writer.writerow(values)
+            if not self.catalog.save(self.price_table_path):
+                messagebox.showinfo("No Changes", "The price table has no unsaved changes")
+                return
             
+            engine.invalidate_price_table(self.price_table_path)
             messagebox.showinfo("Success", "Price table saved successfully")
             
         except Exception as e:
             messagebox.showerror("Error", f"Error saving price table: {str(e)}")
+    
+    def close(self):
+        """Close the editor, asking first if there are unsaved changes"""
+        if self.catalog.modified and not messagebox.askyesno(
+                "Unsaved Changes", "The price table has unsaved changes. Close without saving?"):
+            return
+        self.window.destroy()
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Parts List Processor")
+    parser.add_argument('--timings', help="Append per-stage time, rows and peak memory to this JSON lines log")
+    parser.add_argument('--profile', help="Write a cProfile profile of each parts list load to this file")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = PartsListProcessor(root)
+    app = PartsListProcessor(root, args.timings, args.profile)
     root.mainloop()
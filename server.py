@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from engine import COST_HEADERS, QUANTITY_HEADERS, SUMMARY_HEADERS, PricingEngine
+
+# Largest parts list body accepted, in bytes
+MAX_BODY = 256 * 1024 * 1024
+
+
+def price_response(engine: PricingEngine, text: str, quantity: bool = True) -> Dict:
+    """Price parts list text into the JSON response body"""
+    result = engine.price_text(text)
+    response = {
+        'parts': result['parts'],
+        'summary_headers': SUMMARY_HEADERS,
+        'summary_table': result['summary_table'],
+        'cost_headers': COST_HEADERS,
+        'cost_table': result['cost_table'],
+        'total_cost': result['total_cost'],
+        'stages': result['stages']
+    }
+    if quantity:
+        response['quantity_headers'] = QUANTITY_HEADERS
+        response['quantity_table'] = list(result['quantity_table'])
+    return response
+
+
+def worker_price_response(text: str, quantity: bool = True) -> Dict:
+    import batch
+    return price_response(batch._worker_engine, text, quantity)
+
+
+class PricingServer(ThreadingHTTPServer):
+    """HTTP server that prices parts lists with warm, shared pricing state.
+
+    Each request is handled on its own thread. With a process pool, the
+    pricing itself runs in worker processes that each keep their own price
+    index loaded; otherwise it runs on the request thread with the server's
+    engine.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, engine: PricingEngine, pool=None):
+        super().__init__(address, PricingRequestHandler)
+        self.engine = engine
+        self.pool = pool
+
+    def price(self, text: str, quantity: bool = True) -> Dict:
+        if self.pool is not None:
+            return self.pool.submit(worker_price_response, text, quantity).result()
+        return price_response(self.engine, text, quantity)
+
+
+class PricingRequestHandler(BaseHTTPRequestHandler):
+    """POST /price with a parts list body returns its tables as JSON; GET /health checks the server"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, keep-alive
+    # clients wait ~40 ms for delayed ACKs on every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if urlparse(self.path).path != '/health':
+            self.send_json(404, {'error': 'Not found'})
+            return
+        self.send_json(200, {'status': 'ok', 'price_rows': len(self.server.engine.price_data)})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/price':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        length = self.headers.get('Content-Length')
+        if length is None:
+            self.send_json(411, {'error': 'Content-Length required'})
+            return
+        try:
+            length = int(length)
+        except ValueError:
+            self.send_json(400, {'error': f'Invalid Content-Length: {length}'})
+            return
+        if length > MAX_BODY:
+            self.send_json(413, {'error': f'Parts list larger than {MAX_BODY} bytes'})
+            return
+
+        try:
+            text = self.rfile.read(length).decode('utf-8')
+        except UnicodeDecodeError as e:
+            self.send_json(400, {'error': f'Parts list is not UTF-8: {e}'})
+            return
+
+        # ?quantity=0 leaves the (large) quantity table out of the response
+        quantity = parse_qs(url.query).get('quantity', ['1'])[0] not in ('0', 'false')
+        try:
+            self.send_json(200, self.server.price(text, quantity))
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+
+    def send_json(self, status: int, body: Dict):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet under load; errors are still returned to the client
+        pass
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local HTTP pricing service")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--price-table', default="price_table.csv", help="Price table CSV")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for pricing (1 = price on the request threads, "
+                             "0 = one per CPU core)")
+    args = parser.parse_args(argv)
+
+    engine = PricingEngine(args.price_table)
+    if not engine.price_data:
+        print(f"Price table not found or empty: {args.price_table}", file=sys.stderr)
+        return 1
+
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        # Only multi-process runs pay for importing multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from batch import init_worker
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=(args.price_table,))
+
+    server = PricingServer((args.host, args.port), engine, pool)
+    print(f"Pricing service on http://{args.host}:{server.server_address[1]}/price (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if pool is not None:
+            pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
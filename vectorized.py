@@ -0,0 +1,146 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+from engine import FORMULA_PREFIXES, resolve_formula
+
+# Upper bounds and values of the piecewise factors, checked in order
+WALL_FACTOR_H_BOUNDS = (0.40, 0.50, 0.60, 0.70)
+WALL_FACTOR_H_VALUES = (0.25, 0.30, 0.35, 0.40)
+WARD_FACTOR_P_BOUNDS = (0.30, 0.40, 0.50, 0.60, 0.70, 0.80, 0.90, 1.00, 1.10)
+WARD_FACTOR_P_VALUES = (0.45, 0.50, 0.55, 0.60, 0.65, 0.70, 0.75, 0.80, 0.85)
+
+
+def wall_factor_h(H: np.ndarray) -> np.ndarray:
+    """Array version of the Wall Factor_H table"""
+    return np.select([H <= bound for bound in WALL_FACTOR_H_BOUNDS], WALL_FACTOR_H_VALUES,
+                     default=0.40 + (H - 0.70))
+
+
+def ward_factor_p(P: np.ndarray) -> np.ndarray:
+    """Array version of the Ward Factor_P table"""
+    return np.select([P <= bound for bound in WARD_FACTOR_P_BOUNDS], WARD_FACTOR_P_VALUES,
+                     default=0.90)
+
+
+def wall_formula_array(L: np.ndarray, P: np.ndarray, H: np.ndarray) -> np.ndarray:
+    return (wall_factor_h(H) + (P - 0.30) / 2) * L
+
+
+def ward_formula_array(L: np.ndarray, P: np.ndarray, H: np.ndarray) -> np.ndarray:
+    return L * H * ward_factor_p(P)
+
+
+def zero_formula_array(L: np.ndarray, P: np.ndarray, H: np.ndarray) -> np.ndarray:
+    return np.zeros_like(L)
+
+
+# Formulas whose scalar version branches and needs a separate array version.
+# Every other formula is plain arithmetic and works on arrays as written.
+ARRAY_FORMULAS = {
+    FORMULA_PREFIXES['WALL']: wall_formula_array,
+    FORMULA_PREFIXES['WARD']: ward_formula_array,
+    resolve_formula(''): zero_formula_array
+}
+
+# Kind key shared by every Tabaghe formula, which differ only in their multiplier
+TABAGHE_KIND = 'TABAGHE'
+
+
+def calculate_formula_array(part_types: Sequence[str], L: Sequence[float], P: Sequence[float],
+                            H: Sequence[float]) -> np.ndarray:
+    """Calculate the formula output of many rows at once.
+
+    Results are identical to calculate_formula.
+    """
+    # pandas takes ~0.4 s to import, so only this path loads it
+    import pandas as pd
+
+    type_codes, distinct_types = pd.factorize(pd.Series(part_types, dtype=object), sort=False)
+    return calculate_formula_codes(distinct_types, type_codes, L, P, H)
+
+
+def calculate_formula_codes(distinct_types: Sequence[str], type_codes: np.ndarray, L: Sequence[float],
+                            P: Sequence[float], H: Sequence[float]) -> np.ndarray:
+    """Calculate the formula output of dictionary-encoded rows.
+
+    Each row's type is distinct_types[type_codes[row]]. Rows are grouped by
+    formula kind and every kind is computed over its L/P/H arrays in one pass.
+    """
+    # Convert mm to meters
+    L = np.asarray(L, dtype=np.float64) / 1000
+    P = np.asarray(P, dtype=np.float64) / 1000
+    H = np.asarray(H, dtype=np.float64) / 1000
+    type_codes = np.asarray(type_codes, dtype=np.intp)
+
+    # Resolve each distinct type string once, then map every row to its kind
+    kinds = []
+    kind_codes = {}
+    type_kinds = np.empty(len(distinct_types), dtype=np.intp)
+    type_multipliers = np.zeros(len(distinct_types), dtype=np.float64)
+
+    for type_code, part_type in enumerate(distinct_types):
+        formula = resolve_formula(part_type)
+        multiplier = getattr(formula, 'multiplier', None)
+        kind = TABAGHE_KIND if multiplier is not None else formula
+        if kind not in kind_codes:
+            kind_codes[kind] = len(kinds)
+            kinds.append(kind)
+        type_kinds[type_code] = kind_codes[kind]
+        if multiplier is not None:
+            type_multipliers[type_code] = multiplier
+
+    codes = type_kinds[type_codes]
+    output = np.empty(len(codes), dtype=np.float64)
+
+    for code, kind in enumerate(kinds):
+        rows = np.flatnonzero(codes == code)
+        if kind == TABAGHE_KIND:
+            output[rows] = L[rows] * P[rows] * H[rows] * type_multipliers[type_codes[rows]]
+        else:
+            formula = ARRAY_FORMULAS.get(kind, kind)
+            output[rows] = formula(L[rows], P[rows], H[rows])
+
+    return output
+
+
+def aggregate_codes(key_columns: Sequence[np.ndarray], sizes: Sequence[int], outputs: np.ndarray,
+                    keep: Optional[np.ndarray] = None) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray,
+                                                                np.ndarray, np.ndarray]:
+    """Sort-based group-by of outputs on integer key columns.
+
+    key_columns[i] holds codes in range(sizes[i]); rows where keep is False
+    are skipped. Returns the key columns of the distinct groups and each
+    group's total, row count, min and max. Totals are accumulated in row
+    order, so they match a plain Python loop exactly.
+    """
+    if keep is not None:
+        key_columns = [codes[keep] for codes in key_columns]
+        outputs = outputs[keep]
+
+    sizes = [max(size, 1) for size in sizes]
+    if int(np.prod(sizes, dtype=object)) < 2 ** 62:
+        # Pack the key columns into one int64 so grouping is a single sort
+        combined = np.zeros(len(outputs), dtype=np.int64)
+        for codes, size in zip(key_columns, sizes):
+            combined = combined * size + codes
+        unique_combined, inverse = np.unique(combined, return_inverse=True)
+
+        group_codes = []
+        for size in reversed(sizes):
+            group_codes.append(unique_combined % size)
+            unique_combined = unique_combined // size
+        group_codes.reverse()
+    else:
+        unique_keys, inverse = np.unique(np.column_stack(key_columns), axis=0, return_inverse=True)
+        group_codes = list(unique_keys.T)
+
+    inverse = inverse.reshape(-1)
+    group_count = len(group_codes[0]) if group_codes else 0
+    totals = np.bincount(inverse, weights=outputs, minlength=group_count)
+    counts = np.bincount(inverse, minlength=group_count)
+    mins = np.full(group_count, np.inf)
+    np.minimum.at(mins, inverse, outputs)
+    maxs = np.full(group_count, -np.inf)
+    np.maximum.at(maxs, inverse, outputs)
+
+    return group_codes, totals, counts, mins, maxs
@@ -0,0 +1,138 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from batch import cost_table_path, price_and_write
+from engine import PricingEngine
+
+
+class PartsListWatcher:
+    """Reprice the parts lists in a folder as they are added or changed.
+
+    The folder is polled for *.txt files. A new or changed file is priced
+    once its size and modification time have stayed the same for settle
+    seconds, so files that are still being written are not read half done.
+    The engine's price index stays loaded between files and is only parsed
+    again when the price table changes on disk.
+    """
+
+    def __init__(self, directory: str, engine: PricingEngine, output_dir: str = None,
+                 settle: float = 0.3, cache: bool = False):
+        self.directory = directory
+        self.engine = engine
+        self.output_dir = output_dir
+        self.settle = settle
+        self.cache = cache
+        self.pending = {}  # filename -> (stamp, time that stamp was first seen)
+        self.priced = {}  # filename -> stamp when it was last priced
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Modification time and size of every parts list in the folder"""
+        stamps = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith('.txt') and entry.is_file():
+                    stat = entry.stat()
+                    stamps[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def skip_priced(self):
+        """Treat files whose cost table is newer than the file as already priced"""
+        for filename, stamp in self.scan().items():
+            try:
+                if os.stat(cost_table_path(filename, self.output_dir)).st_mtime_ns >= stamp[0]:
+                    self.priced[filename] = stamp
+            except OSError:
+                pass
+
+    def poll(self, now: float = None) -> List[Dict]:
+        """Price the files that changed and have settled, returning their results"""
+        now = time.monotonic() if now is None else now
+        stamps = self.scan()
+
+        for filename in list(self.pending):
+            if filename not in stamps:
+                del self.pending[filename]
+        for filename in list(self.priced):
+            if filename not in stamps:
+                del self.priced[filename]
+
+        results = []
+        for filename, stamp in sorted(stamps.items()):
+            if self.priced.get(filename) == stamp:
+                continue
+
+            pending = self.pending.get(filename)
+            if pending is None or pending[0] != stamp:
+                # New or still being written; wait until it settles
+                pending = self.pending[filename] = (stamp, now)
+            if now - pending[1] < self.settle:
+                continue
+
+            del self.pending[filename]
+            result = price_and_write(self.engine, filename, self.output_dir, self.cache)
+            result['latency'] = time.monotonic() - pending[1]
+            # Failed files are also marked, so they are only retried once they change
+            self.priced[filename] = stamp
+            results.append(result)
+
+        return results
+
+    def run(self, interval: float = 0.2, stop: threading.Event = None):
+        """Poll the folder every interval seconds until stop is set"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for result in self.poll():
+                if result['error']:
+                    print(f"{result['filename']}: ERROR {result['error']}", file=sys.stderr)
+                else:
+                    print(f"{result['filename']}: {result['parts']} ADIN parts, "
+                          f"total cost {result['total_cost']:.2f} -> {result['output']} "
+                          f"({result['latency']:.2f}s)")
+            stop.wait(interval)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reprice parts lists as they land in a folder")
+    parser.add_argument('directory', help="Folder to watch for parts list files")
+    parser.add_argument('--price-table', default="price_table.csv", help="Price table CSV")
+    parser.add_argument('--output-dir', help="Directory for cost tables (default: next to each input)")
+    parser.add_argument('--interval', type=float, default=0.2, help="Seconds between folder scans")
+    parser.add_argument('--settle', type=float, default=0.3,
+                        help="Seconds a file must stay unchanged before it is priced")
+    parser.add_argument('--all', action='store_true',
+                        help="Also reprice files whose cost table is already up to date")
+    parser.add_argument('--cache', action='store_true',
+                        help="Read and write the binary parsed-table cache next to each input")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 1
+
+    # Load the price index up front so the first file doesn't pay for it
+    engine = PricingEngine(args.price_table)
+    if not engine.price_data:
+        print(f"Price table not found or empty: {args.price_table}", file=sys.stderr)
+        return 1
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    watcher = PartsListWatcher(args.directory, engine, args.output_dir, args.settle, args.cache)
+    if not args.all:
+        watcher.skip_priced()
+
+    print(f"Watching {args.directory} for parts lists (Ctrl+C to stop)")
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())